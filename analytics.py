@@ -0,0 +1,328 @@
+"""
+analytics.py - Informe de temporada a partir de una carpeta de partidas
+
+Lee todas las partidas de la carpeta (.json y .bjl) una sola vez y las pasa
+a columnas (array de la biblioteca estándar): una fila por mano y equipo con
+los campos de RoundScore, y una fila por partida con sus equipos y el
+ganador. Los agregados salen de recorrer esas columnas, sin armar objetos
+Game:
+
+- matriz de enfrentamientos: cuántas veces cada equipo le ganó a cada otro
+- histograma de puntajes por mano
+- aporte promedio por mano de fichas, canastas, cierre y muerto
+
+Las columnas se guardan en disco (CACHE_DIR) con la "versión" de la carpeta
+(nombre, tamaño y fecha de cada archivo) y el informe queda en memoria con
+esa versión y las reglas vigentes: mientras no cambie nada, abrirlo de nuevo
+es inmediato. Las partidas .json solo tienen el total de cada mano, así que
+cuentan para la matriz y el histograma pero no para los aportes.
+
+Uso:
+    python analytics.py carpeta_con_partidas
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from game import BONUS, JOURNAL_EXT, JournalReader, RoundScore, iter_archive, rules_signature
+from storage import atomic_write
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".buraco_analytics")
+CACHE_FORMAT = 1
+HISTOGRAM_BIN = 100
+
+
+# ── Columnas ──────────────────────────────────────────────────────────────────
+
+@dataclass
+class Columns:
+    version: str
+    names: list[str] = field(default_factory=list)     # id de equipo → nombre
+    # Una fila por partida
+    game_files: list[str] = field(default_factory=list)
+    game_teams: list[tuple[int, ...]] = field(default_factory=list)
+    game_winner: array = field(default_factory=lambda: array("l"))  # -1: sin terminar
+    # Una fila por mano y equipo
+    game: array = field(default_factory=lambda: array("l"))
+    team: array = field(default_factory=lambda: array("l"))
+    total: array = field(default_factory=lambda: array("l"))
+    detailed: array = field(default_factory=lambda: array("b"))     # 0: solo el total
+    cards_down: array = field(default_factory=lambda: array("l"))
+    cards_remaining: array = field(default_factory=lambda: array("l"))
+    cierre: array = field(default_factory=lambda: array("b"))
+    canastas_puras: array = field(default_factory=lambda: array("l"))
+    canastas_impuras: array = field(default_factory=lambda: array("l"))
+    muerto_bought: array = field(default_factory=lambda: array("b"))
+    muerto_available: array = field(default_factory=lambda: array("b"))
+
+    @property
+    def rows(self) -> int:
+        return len(self.total)
+
+    def _team_id(self, ids: dict[str, int], name: str) -> int:
+        if name not in ids:
+            ids[name] = len(self.names)
+            self.names.append(name)
+        return ids[name]
+
+    def _add_game(self, ids: dict[str, int], path: str, names: list[str],
+                  winner: Optional[str]) -> tuple[int, tuple[int, ...]]:
+        teams = tuple(self._team_id(ids, n) for n in names)
+        self.game_files.append(os.path.basename(path))
+        self.game_teams.append(teams)
+        self.game_winner.append(ids[winner] if winner in names else -1)
+        return len(self.game_teams) - 1, teams
+
+    def _add_totals(self, g: int, teams: tuple[int, ...], totals: list[int]):
+        for team, pts in zip(teams, totals):
+            self.game.append(g)
+            self.team.append(team)
+            self.total.append(pts)
+            self.detailed.append(0)
+            for col in (self.cards_down, self.cards_remaining, self.cierre, self.canastas_puras,
+                        self.canastas_impuras, self.muerto_bought, self.muerto_available):
+                col.append(0)
+
+    def _add_scores(self, g: int, teams: tuple[int, ...], scores: list[dict]):
+        for team, s in zip(teams, scores):
+            score = RoundScore(**s)
+            self.game.append(g)
+            self.team.append(team)
+            self.total.append(score.total)
+            self.detailed.append(1)
+            self.cards_down.append(score.cards_down)
+            self.cards_remaining.append(score.cards_remaining)
+            self.cierre.append(score.cierre)
+            self.canastas_puras.append(score.canastas_puras)
+            self.canastas_impuras.append(score.canastas_impuras)
+            self.muerto_bought.append(score.muerto_bought)
+            self.muerto_available.append(score.muerto_available)
+
+
+def archive_version(folder: str) -> str:
+    """Cambia si se agrega, borra o modifica cualquier partida de la carpeta."""
+    entries = []
+    for name in sorted(os.listdir(folder)):
+        if name.endswith((".json", JOURNAL_EXT)):
+            st = os.stat(os.path.join(folder, name))
+            entries.append(f"{name}\0{st.st_size}\0{st.st_mtime_ns}")
+    return hashlib.sha1("\n".join(entries).encode("utf-8")).hexdigest()
+
+
+def load_columns(folder: str, version: Optional[str] = None) -> Columns:
+    """Lee la carpeta a columnas, sin pasar por Game."""
+    cols = Columns(version or archive_version(folder))
+    ids: dict[str, int] = {}
+
+    def load(path: str):
+        if JournalReader.is_journal(path):
+            _load_journal(cols, ids, path)
+        else:
+            _load_json(cols, ids, path)
+
+    for _ in iter_archive(folder, load):
+        pass  # cada partida se agrega a las columnas al leerla
+    return cols
+
+
+def _load_journal(cols: Columns, ids: dict[str, int], path: str):
+    with JournalReader(path) as reader:
+        hands = [hand for batch in reader.iter_batches() for hand in batch]
+        header = reader.header
+    if len(hands) != header["hands"]:
+        raise ValueError("El diario está incompleto: faltan manos.")
+    g, teams = cols._add_game(ids, path, [t["name"] for t in header["teams"]], header.get("winner"))
+    for hand in hands:
+        if "scores" in hand:
+            cols._add_scores(g, teams, hand["scores"])
+        else:
+            cols._add_totals(g, teams, hand["totals"])
+
+
+def _load_json(cols: Columns, ids: dict[str, int], path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    names = [t["name"] for t in data["teams"]]
+    columns = [t["scores"] for t in data["teams"]]
+    g, teams = cols._add_game(ids, path, names, data.get("winner"))
+    for totals in zip(*columns):
+        cols._add_totals(g, teams, list(totals))
+
+
+def _cache_path(folder: str) -> str:
+    key = hashlib.sha1(os.path.abspath(folder).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, key + ".pickle")
+
+
+def cached_columns(folder: str, version: Optional[str] = None) -> Columns:
+    """Columnas de la carpeta; se vuelven a leer solo si la carpeta cambió."""
+    version = version or archive_version(folder)
+    path = _cache_path(folder)
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("format") == CACHE_FORMAT and data["columns"].version == version:
+            return data["columns"]
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, AttributeError):
+        pass
+    cols = load_columns(folder, version)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        atomic_write(path, lambda f: pickle.dump({"format": CACHE_FORMAT, "columns": cols},
+                                                 f, pickle.HIGHEST_PROTOCOL),
+                     fsync=False, binary=True)
+    except OSError:
+        pass  # sin caché en disco: la próxima vez se vuelve a leer
+    return cols
+
+
+# ── Agregados ─────────────────────────────────────────────────────────────────
+
+def head_to_head(cols: Columns) -> list[list[int]]:
+    """matrix[a][b]: partidas terminadas en las que a le ganó a b."""
+    n = len(cols.names)
+    matrix = [[0] * n for _ in range(n)]
+    for teams, winner in zip(cols.game_teams, cols.game_winner):
+        if winner < 0:
+            continue
+        row = matrix[winner]
+        for other in teams:
+            if other != winner:
+                row[other] += 1
+    return matrix
+
+
+def score_histogram(cols: Columns, bin_size: int = HISTOGRAM_BIN) -> list[tuple[int, int]]:
+    """(desde, cantidad) de los puntajes por mano, en intervalos de bin_size."""
+    counts = Counter(v // bin_size * bin_size for v in cols.total)
+    return sorted(counts.items())
+
+
+def contributions(cols: Columns) -> dict[str, float]:
+    """Aporte promedio por mano (y equipo) de cada jugada, sobre las manos con detalle."""
+    rows = sum(cols.detailed)
+    if not rows:
+        return {}
+
+    def masked_sum(column: array) -> int:
+        return sum(v for v, d in zip(column, cols.detailed) if d)
+
+    muerto_net = sum((BONUS["muerto"] if bought else -BONUS["muerto"])
+                     for bought, avail, d in zip(cols.muerto_bought, cols.muerto_available, cols.detailed)
+                     if d and avail)
+    parts = {
+        "Fichas (bajadas - en mano)": masked_sum(cols.cards_down) - masked_sum(cols.cards_remaining),
+        "Canastas puras":   masked_sum(cols.canastas_puras) * BONUS["canasta_pura"],
+        "Canastas impuras": masked_sum(cols.canastas_impuras) * BONUS["canasta_impura"],
+        "Cierre":           masked_sum(cols.cierre) * BONUS["cierre"],
+        "Muerto":           muerto_net,
+    }
+    return {name: total / rows for name, total in parts.items()}
+
+
+def team_summary(cols: Columns) -> list[tuple[str, int, int, float]]:
+    """(nombre, partidas, ganadas, promedio por mano), de más a menos ganadas."""
+    played = Counter(t for teams in cols.game_teams for t in teams)
+    wins = Counter(w for w in cols.game_winner if w >= 0)
+    points = [0] * len(cols.names)
+    hands = [0] * len(cols.names)
+    for team, pts in zip(cols.team, cols.total):
+        points[team] += pts
+        hands[team] += 1
+    rows = [(name, played[i], wins[i], points[i] / hands[i] if hands[i] else 0.0)
+            for i, name in enumerate(cols.names)]
+    return sorted(rows, key=lambda r: (-r[2], -r[3], r[0]))
+
+
+# ── Informe ───────────────────────────────────────────────────────────────────
+
+@dataclass
+class SeasonReport:
+    names: list[str]
+    games: int
+    finished: int
+    hands: int
+    detailed_hands: int
+    teams: list[tuple[str, int, int, float]]
+    matrix: list[list[int]]
+    histogram: list[tuple[int, int]]
+    contributions: dict[str, float]
+
+    def format(self, max_teams: int = 12) -> str:
+        lines = [f"Partidas: {self.games} ({self.finished} terminadas)   "
+                 f"Manos por equipo: {self.hands} ({self.detailed_hands} con detalle)", ""]
+
+        lines.append("Equipo                 Partidas  Ganadas  Prom./mano")
+        for name, played, wins, avg in self.teams:
+            lines.append(f"{name[:22]:<22} {played:>8} {wins:>8} {avg:>11.1f}")
+
+        # Matriz: solo los equipos con más victorias, para que entre en pantalla
+        top = [self.names.index(row[0]) for row in self.teams[:max_teams]]
+        lines += ["", "Enfrentamientos (fila le ganó a columna)"]
+        lines.append(" " * 14 + "".join(f"{self.names[j][:6]:>7}" for j in top))
+        for i in top:
+            lines.append(f"{self.names[i][:13]:<14}" +
+                         "".join(f"{'-' if i == j else self.matrix[i][j]:>7}" for j in top))
+
+        lines += ["", "Puntaje por mano"]
+        peak = max((count for _, count in self.histogram), default=0)
+        for start, count in self.histogram:
+            bar = "█" * max(1, round(40 * count / peak)) if count else ""
+            lines.append(f"{start:>6} a {start + HISTOGRAM_BIN - 1:>6} {count:>7}  {bar}")
+
+        lines += ["", "Aporte promedio por mano"]
+        if not self.contributions:
+            lines.append("  (no hay partidas guardadas con detalle: usá el formato .bjl)")
+        for name, avg in self.contributions.items():
+            lines.append(f"  {name:<28} {avg:>+8.1f}")
+        return "\n".join(lines)
+
+
+_REPORTS: dict[str, tuple[tuple, SeasonReport]] = {}
+
+
+def season_report(folder: str) -> SeasonReport:
+    """Informe de la carpeta; se recalcula solo si cambió la carpeta o las reglas."""
+    key = (archive_version(folder), rules_signature())
+    folder = os.path.abspath(folder)
+    cached = _REPORTS.get(folder)
+    if cached and cached[0] == key:
+        return cached[1]
+    cols = cached_columns(folder, key[0])
+    report = SeasonReport(
+        names=cols.names,
+        games=len(cols.game_teams),
+        finished=sum(1 for w in cols.game_winner if w >= 0),
+        hands=cols.rows,
+        detailed_hands=sum(cols.detailed),
+        teams=team_summary(cols),
+        matrix=head_to_head(cols),
+        histogram=score_histogram(cols),
+        contributions=contributions(cols),
+    )
+    _REPORTS[folder] = (key, report)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Informe de temporada de una carpeta de partidas.")
+    parser.add_argument("folder", help="carpeta con las partidas (.json / .bjl)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = season_report(args.folder)
+    elapsed = time.perf_counter() - start
+    print(report.format())
+    print(f"\nInforme en {elapsed:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -43,6 +43,16 @@ pyinstaller ^
     --add-data "calculator.py;." ^
     --add-data "round_dialog.py;." ^
     --add-data "ui.py;." ^
+    --add-data "layout.py;." ^
+    --add-data "ratings.py;." ^
+    --add-data "storage.py;." ^
+    --add-data "score_index.py;." ^
+    --add-data "solver.py;." ^
+    --add-data "spectator.py;." ^
+    --add-data "website.py;." ^
+    --add-data "events.py;." ^
+    --add-data "chart.py;." ^
+    --add-data "analytics.py;." ^
     main.py
 
 if errorlevel 1 (
@@ -8,19 +8,35 @@ from game import CARD_VALUES, calculate_cards
 
 
 class CardCalculatorDialog(tk.Toplevel):
-    """Ventana emergente para calcular el valor de un conjunto de fichas."""
+    """
+    Ventana emergente para calcular el valor de un conjunto de fichas.
+    Se construye una sola vez y se reutiliza con ask(): al cerrarse se oculta.
+    """
 
     def __init__(self, parent, title="Calculadora de Fichas"):
         super().__init__(parent)
+        self.withdraw()
         self.title(title)
         self.resizable(False, False)
         self.result = 0
-        self.grab_set()  # Modal
 
         self.entries: dict = {}
+        self._suspend_traces = False
+        self._done = tk.BooleanVar(value=False)
         self._build_ui()
         self.protocol("WM_DELETE_WINDOW", self._on_cancel)
 
+    def ask(self):
+        """Muestra la calculadora limpia (modal) y devuelve el total, o None si se canceló."""
+        self._clear()
+        self.result = 0
+        self._done.set(False)
+        self.deiconify()
+        self.lift()
+        self.grab_set()
+        self.wait_variable(self._done)
+        return self.result
+
     def _build_ui(self):
         CARD_LABELS = {
             1: "1 → 15 pts",
@@ -89,6 +105,8 @@ class CardCalculatorDialog(tk.Toplevel):
                    command=self._clear).pack(side="left", padx=4)
 
     def _update_sub(self, card, var, sub_var):
+        if self._suspend_traces:
+            return
         try:
             qty = max(0, int(var.get()))
         except ValueError:
@@ -109,13 +127,25 @@ class CardCalculatorDialog(tk.Toplevel):
         self.total_var.set(f"Total: {total} pts")
 
     def _clear(self):
-        for var in self.entries.values():
-            var.set("0")
+        # Todo en un solo lote: sin recalcular por cada variable
+        self._suspend_traces = True
+        try:
+            for card, var in self.entries.items():
+                var.set("0")
+                self._subtotal_vars[card].set("0")
+        finally:
+            self._suspend_traces = False
+        self._recalculate()
+
+    def _close(self):
+        self.grab_release()
+        self.withdraw()
+        self._done.set(True)
 
     def _on_confirm(self):
         self._recalculate()
-        self.destroy()
+        self._close()
 
     def _on_cancel(self):
         self.result = None
-        self.destroy()
\ No newline at end of file
+        self._close()
\ No newline at end of file
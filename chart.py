@@ -0,0 +1,234 @@
+"""
+chart.py - Gráfico de la evolución del puntaje acumulado
+
+ScoreChart es un tk.Canvas con una línea por equipo, la línea del objetivo
+(TARGET_SCORE) y, opcionalmente, partidas archivadas superpuestas en gris.
+
+Para que siga siendo rápido con miles de manos, el eje x se divide en
+tramos de `bucket` manos, con a lo sumo un tramo por pixel; de cada tramo
+se dibuja el primer punto, el mínimo, el máximo y el último (así no se
+pierden picos). Cada tramo es un ítem del canvas con su etiqueta: al
+agregar una mano solo se vuelve a dibujar el último tramo, al deshacer el
+tramo que se acortó, y al corregir o borrar una mano, desde su tramo en
+adelante. Todo se redibuja solo cuando cambia el tamaño, cuando la partida
+ya no entra en el eje x (que se agranda al doble) o en el rango del eje y.
+"""
+
+from itertools import accumulate
+from typing import Optional
+
+import tkinter as tk
+
+from game import Game, TARGET_SCORE, iter_archive
+
+COLORS = ("#1565c0", "#c62828", "#2e7d32")
+OVERLAY_COLOR = "#cfd8dc"
+TARGET_COLOR = "#e53935"
+MIN_HANDS = 16      # ancho mínimo del eje x, en manos
+Y_STEP = 500        # separación de las líneas de referencia
+MARGIN_LEFT, MARGIN_TOP, MARGIN_RIGHT, MARGIN_BOTTOM = 44, 22, 10, 20
+
+
+def _reduce(points: list[int], start: int, stop: int) -> list[tuple[int, int]]:
+    """Primero, mínimo, máximo y último de points[start:stop+1], en orden de mano."""
+    if stop - start <= 3:
+        return [(i, points[i]) for i in range(start, stop + 1)]
+    lo = hi = start
+    for i in range(start + 1, stop):
+        v = points[i]
+        if v < points[lo]:
+            lo = i
+        elif v > points[hi]:
+            hi = i
+    keep = sorted({start, lo, hi, stop})
+    return [(i, points[i]) for i in keep]
+
+
+def load_overlays(folder: str) -> list[list[int]]:
+    """Acumulado del ganador de cada partida terminada de la carpeta."""
+    return [curve for _path, curve in iter_archive(folder, _winner_curve) if curve is not None]
+
+
+def _winner_curve(path: str) -> Optional[list[int]]:
+    game = Game.load(path)
+    try:
+        if not game.is_over:
+            return None
+        idx = game.teams.index(game.winner)
+        return [0, *accumulate(game.all_scores(idx))]
+    finally:
+        game.close()
+
+
+class ScoreChart(tk.Canvas):
+    def __init__(self, parent, **kwargs):
+        kwargs.setdefault("background", "white")
+        kwargs.setdefault("highlightthickness", 0)
+        kwargs.setdefault("width", 360)
+        kwargs.setdefault("height", 240)
+        super().__init__(parent, **kwargs)
+        self.game: Optional[Game] = None
+        self._names: list[str] = []
+        # Acumulado por equipo, con el 0 inicial: series[t][h] = puntaje después de h manos
+        self._series: list[list[int]] = []
+        self._overlays: list[list[int]] = []
+        self._box = (MARGIN_LEFT, MARGIN_TOP, MARGIN_LEFT + 1, MARGIN_TOP + 1)
+        self._cap = MIN_HANDS              # manos que entran en el eje x
+        self._y_range = (0, TARGET_SCORE)
+        self._bucket = 1
+        self._drawn = 0                    # tramos dibujados
+        self._job: Optional[str] = None
+        # Para medir: redibujos completos y parciales
+        self.full_redraws = 0
+        self.tail_redraws = 0
+        self.bind("<Configure>", lambda _e: self._schedule_redraw())
+
+    # ── Datos ─────────────────────────────────────────────────────────────────
+
+    @property
+    def hands(self) -> int:
+        return len(self._series[0]) - 1 if self._series else 0
+
+    def follow(self, game: Optional[Game]):
+        """Muestra la partida y se actualiza con cada cambio."""
+        if self.game is not None:
+            self.game.remove_listener(self._on_change)
+        self.game = game
+        if game is None:
+            self._names, self._series = [], []
+        else:
+            self._names = [t.name for t in game.teams]
+            self._reload_series()
+            game.add_listener(self._on_change)
+        self._redraw()
+
+    def set_overlays(self, curves: list[list[int]]):
+        self._overlays = curves
+        self._redraw()
+
+    def _reload_series(self):
+        game = self.game
+        self._series = [[0, *accumulate(game.all_scores(i))] for i in range(game.num_teams)]
+
+    def _on_change(self, game: Game, kind: str, number: int):
+        if kind == "add":
+            for series, score in zip(self._series, game.rounds[-1].scores):
+                series.append(series[-1] + score.total)
+            self._update_tail(self.hands)
+        elif kind == "undo":
+            for series in self._series:
+                series.pop()
+            self._update_tail(self.hands + 1)
+        else:  # edit / delete: cambian los acumulados desde esa mano
+            self._reload_series()
+            self._update_tail(number)  # los números de mano incluyen las manos sin detalle
+
+    # ── Dibujo ────────────────────────────────────────────────────────────────
+
+    def _schedule_redraw(self):
+        if self._job is None:
+            self._job = self.after_idle(self._redraw)
+
+    def _plot_box(self) -> tuple[int, int, int, int]:
+        width, height = max(self.winfo_width(), 2), max(self.winfo_height(), 2)
+        return (MARGIN_LEFT, MARGIN_TOP,
+                max(width - MARGIN_RIGHT, MARGIN_LEFT + 1), max(height - MARGIN_BOTTOM, MARGIN_TOP + 1))
+
+    def _fits(self, first_point: int) -> bool:
+        """¿Los puntos desde first_point entran en los ejes actuales?"""
+        if self.hands > self._cap:
+            return False
+        lo, hi = self._y_range
+        tails = [s[first_point:] for s in self._series]
+        return all(lo <= min(t) and max(t) <= hi for t in tails if t)
+
+    def _update_tail(self, first_point: int):
+        """Redibuja desde el tramo que contiene el segmento que llega a first_point."""
+        if not self._fits(first_point):
+            self._redraw()
+            return
+        self.tail_redraws += 1
+        self._draw_buckets(max(first_point - 1, 0) // self._bucket)
+
+    def _redraw(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+        self.full_redraws += 1
+        self.delete("all")
+        self._drawn = 0
+        x0, y0, x1, y1 = self._box = self._plot_box()
+
+        longest = max([self.hands] + [len(c) - 1 for c in self._overlays])
+        cap = MIN_HANDS
+        while cap < longest:
+            cap *= 2
+        self._cap = cap
+        self._bucket = max(1, -(-cap // (x1 - x0)))
+        values = [v for s in self._series + self._overlays for v in (min(s), max(s))]
+        lo = min([0] + values)
+        hi = max([TARGET_SCORE] + values)
+        # Un poco de aire arriba y abajo para no redibujar todo con cada mano
+        self._y_range = (lo // Y_STEP * Y_STEP - (Y_STEP if lo < 0 else 0),
+                         -(-hi // Y_STEP) * Y_STEP + Y_STEP)
+
+        lo, hi = self._y_range
+        step = Y_STEP * max(1, -(-(hi - lo) // Y_STEP) // 8)
+        for value in range(lo, hi + 1, step):
+            y = self._y(value)
+            self.create_line(x0, y, x1, y, fill="#eceff1")
+            self.create_text(x0 - 4, y, text=str(value), anchor="e",
+                             font=("Segoe UI", 8), fill="#78909c")
+        y = self._y(TARGET_SCORE)
+        self.create_line(x0, y, x1, y, fill=TARGET_COLOR, dash=(4, 3))
+        self.create_text(x1, y - 2, text=str(TARGET_SCORE), anchor="se",
+                         font=("Segoe UI", 8), fill=TARGET_COLOR)
+        self.create_line(x0, y1, x1, y1, fill="#90a4ae")
+        self.create_text(x1, y1 + 2, text=f"{cap} manos", anchor="ne",
+                         font=("Segoe UI", 8), fill="#78909c")
+
+        for curve in self._overlays:
+            coords = self._coords(curve, 0, len(curve) - 1)
+            if len(coords) >= 4:
+                self.create_line(*coords, fill=OVERLAY_COLOR)
+
+        x = x0
+        for i, name in enumerate(self._names):
+            item = self.create_text(x, 4, text=f"● {name}", anchor="nw",
+                                    font=("Segoe UI", 9, "bold"), fill=COLORS[i % len(COLORS)])
+            x = self.bbox(item)[2] + 12
+
+        self._draw_buckets(0)
+
+    def _draw_buckets(self, first: int):
+        for k in range(first, self._drawn):
+            self.delete(f"b{k}")
+        hands = self.hands
+        count = -(-hands // self._bucket)
+        for k in range(first, count):
+            start = k * self._bucket
+            stop = min(start + self._bucket, hands)
+            for i, series in enumerate(self._series):
+                self.create_line(*self._coords(series, start, stop),
+                                 fill=COLORS[i % len(COLORS)], width=2, tags=f"b{k}")
+        self._drawn = count
+
+    def _coords(self, points: list[int], start: int, stop: int) -> list[float]:
+        """Coordenadas de points[start:stop+1], reducidas a cuatro puntos por tramo."""
+        coords: list[float] = []
+        bucket = self._bucket
+        for k0 in range(start, stop, bucket):
+            reduced = _reduce(points, k0, min(k0 + bucket, stop))
+            for h, v in (reduced if not coords else reduced[1:]):
+                coords.append(self._x(h))
+                coords.append(self._y(v))
+        return coords
+
+    def _x(self, hand: int) -> float:
+        x0, _y0, x1, _y1 = self._box
+        return x0 + (x1 - x0) * hand / self._cap
+
+    def _y(self, value: int) -> float:
+        _x0, y0, _x1, y1 = self._box
+        lo, hi = self._y_range
+        return y1 - (y1 - y0) * (value - lo) / (hi - lo)
@@ -0,0 +1,361 @@
+"""
+equivalence.py - Comparación diferencial entre motores de puntaje
+
+Genera partidas al azar (con semilla) intercalando manos, deshacer,
+correcciones y borrados, las juega en paralelo sobre un modelo de referencia
+fijo (ReferenceGame) y sobre un motor, y compara el estado después de cada
+paso: totales, ganador, was_tied_win, número de mano y subtotales de la
+última mano (el historial completo se compara al final). Si aparece una
+diferencia, achica la secuencia hasta una reproducción mínima.
+
+La referencia no comparte código con Game más allá de RoundScore.total:
+recalcula totales y ganador recorriendo los acumulados mano por mano después
+de cada operación. Así también se prueba Game mismo (motor "juego").
+
+Un motor es cualquier fábrica `f(team_names) -> motor` cuyo resultado tenga
+la misma interfaz que Game: add_round(), undo_last_round(), edit_round(),
+delete_round(), teams (con .name y .total), rounds, winner, was_tied_win,
+current_round e is_over. Los motores que no admiten correcciones (historial
+paginado) se prueban solo con manos y deshacer.
+
+Uso:
+    python equivalence.py --engine juego --games 5000 --seed 1
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Callable, Optional
+
+from game import Game, Round, RoundScore, TARGET_SCORE
+
+# ("add", [RoundScore, ...]) | ("undo",) | ("edit", posición, [RoundScore, ...]) | ("delete", posición)
+# La posición es una fracción en [0, 1) de las manos que haya en ese momento.
+Op = tuple
+
+
+# ── Modelo de referencia ───────────────────────────────────────────────────────
+
+@dataclass
+class _RefTeam:
+    name: str
+    total: int = 0
+
+
+class ReferenceGame:
+    """Guarda las manos y recalcula todo desde cero después de cada cambio."""
+
+    def __init__(self, team_names: list[str]):
+        self.teams = [_RefTeam(n) for n in team_names]
+        self.rounds: list[Round] = []
+        self._totals: list[tuple[int, ...]] = []  # subtotales de cada mano
+        self._recompute()
+
+    @property
+    def is_over(self) -> bool:
+        return self.winner is not None
+
+    def add_round(self, scores: list[RoundScore]):
+        self.rounds.append(Round(len(self.rounds) + 1, list(scores)))
+        self._totals.append(tuple(s.total for s in scores))
+        self._recompute()
+
+    def undo_last_round(self):
+        if self.rounds:
+            self.rounds.pop()
+            self._totals.pop()
+            self._recompute()
+
+    def edit_round(self, number: int, scores: list[RoundScore]):
+        self.rounds[number - 1] = Round(number, list(scores))
+        self._totals[number - 1] = tuple(s.total for s in scores)
+        self._recompute()
+
+    def delete_round(self, number: int):
+        del self.rounds[number - 1]
+        del self._totals[number - 1]
+        self.rounds = [Round(i, r.scores) for i, r in enumerate(self.rounds, start=1)]
+        self._recompute()
+
+    def _recompute(self):
+        # Gana quien llegó primero a TARGET_SCORE; si llegaron varios en esa
+        # mano, el de mayor acumulado en ese momento (el primero si empatan)
+        acc = [0] * len(self.teams)
+        self.winner = None
+        self.was_tied_win = False
+        for hand in self._totals:
+            for i, pts in enumerate(hand):
+                acc[i] += pts
+            if self.winner is None:
+                reached = [i for i, a in enumerate(acc) if a >= TARGET_SCORE]
+                if reached:
+                    best = max(reached, key=lambda i: acc[i])
+                    self.winner = self.teams[best]
+                    self.was_tied_win = len(reached) > 1
+        for team, total in zip(self.teams, acc):
+            team.total = total
+        self.current_round = len(self.rounds) + 1
+
+
+def reference_engine(team_names: list[str]) -> ReferenceGame:
+    return ReferenceGame(team_names)
+
+
+# ── Motores a comparar ─────────────────────────────────────────────────────────
+
+
+def paged_engine(team_names: list[str]) -> Game:
+    """Historial paginado con páginas chicas, para forzar idas y vueltas a disco."""
+    return Game(team_names, max_resident_rounds=2)
+
+
+class IndexedGame(Game):
+    """Determina el ganador con el índice de acumulados en lugar de los totales."""
+
+    def _check_winner(self):
+        self._rederive_winner()
+
+
+def indexed_engine(team_names: list[str]) -> Game:
+    game = IndexedGame(team_names)
+    game.index  # se arma desde el principio para probar la actualización incremental
+    return game
+
+
+# nombre → (fábrica, ¿admite corregir y borrar manos?)
+ENGINES: dict[str, tuple[Callable, bool]] = {
+    "juego": (Game, True),
+    "paginado": (paged_engine, False),
+    "indice": (indexed_engine, True),
+}
+
+
+@dataclass
+class Mismatch:
+    seed: Optional[int]
+    team_names: list[str]
+    ops: list
+    step: int
+    expected: tuple
+    actual: tuple
+
+    def describe(self) -> str:
+        lines = [f"Diferencia en el paso {self.step} (semilla {self.seed}), "
+                 f"equipos {self.team_names}:"]
+        for i, op in enumerate(self.ops):
+            if op[0] == "undo":
+                lines.append(f"  {i:3}: deshacer")
+            elif op[0] == "delete":
+                lines.append(f"  {i:3}: borrar mano en {op[1]:.0%}")
+            elif op[0] == "edit":
+                lines.append(f"  {i:3}: corregir mano en {op[1]:.0%} "
+                             f"{[_describe_score(s) for s in op[2]]}")
+            else:
+                lines.append(f"  {i:3}: mano {[_describe_score(s) for s in op[1]]}")
+        lines.append(f"  esperado: {self.expected}")
+        lines.append(f"  obtenido: {self.actual}")
+        return "\n".join(lines)
+
+
+def _describe_score(s: RoundScore) -> str:
+    default = RoundScore(s.team_name)
+    changed = {k: v for k, v in vars(s).items()
+               if k != "team_name" and getattr(default, k) != v}
+    return f"{s.team_name}{changed or ''}"
+
+
+# ── Observación del estado ─────────────────────────────────────────────────────
+
+def observe(engine) -> tuple:
+    """Estado comparado después de cada paso (barato: solo la última mano)."""
+    last = engine.rounds[-1].scores if engine.rounds else ()
+    return (
+        tuple(t.total for t in engine.teams),
+        engine.winner.name if engine.winner else None,
+        engine.was_tied_win,
+        engine.current_round,
+        len(engine.rounds),
+        tuple(s.total for s in last),
+    )
+
+
+def observe_history(engine) -> tuple:
+    """Subtotales de todas las manos; se compara una vez al final de la partida."""
+    return tuple(tuple(s.total for s in r.scores) for r in engine.rounds)
+
+
+# ── Generación de partidas ─────────────────────────────────────────────────────
+
+_PURAS = (0, 0, 0, 1, 1, 2, 3)
+_IMPURAS = (0, 0, 1, 1, 2, 3)
+
+
+def random_score(rng: random.Random, name: str) -> RoundScore:
+    # rng.random() directo: randrange/choice son varias veces más lentos
+    r = rng.random
+    puras = _PURAS[int(r() * len(_PURAS))]
+    impuras = _IMPURAS[int(r() * len(_IMPURAS))]
+    muerto = r() < 0.7
+    return RoundScore(
+        team_name=name,
+        cards_down=int(r() * 160) * 5,
+        cards_remaining=int(r() * 30) * 5,
+        cierre=muerto and (puras + impuras) > 0 and r() < 0.4,
+        canastas_puras=puras,
+        canastas_impuras=impuras,
+        muerto_bought=muerto,
+        muerto_available=r() < 0.95,
+    )
+
+
+POOL_SIZE = 4096
+
+
+@lru_cache(maxsize=None)
+def score_pool(name: str) -> tuple[RoundScore, ...]:
+    """Puntajes al azar de un equipo, generados una sola vez (armarlos era la mitad del tiempo)."""
+    rng = random.Random(f"pool-{name}")
+    return tuple(random_score(rng, name) for _ in range(POOL_SIZE))
+
+
+def random_ops(rng: random.Random, team_names: list[str], length: int,
+               corrections: bool = True) -> list:
+    r = rng.random
+    pools = [score_pool(n) for n in team_names]
+
+    def hand():
+        return [pool[int(r() * POOL_SIZE)] for pool in pools]
+
+    ops = []
+    for _ in range(length):
+        x = r()
+        if x < 0.15:
+            ops.append(("undo",))
+        elif corrections and x < 0.25:
+            ops.append(("edit", r(), hand()))
+        elif corrections and x < 0.30:
+            ops.append(("delete", r()))
+        else:
+            ops.append(("add", hand()))
+    return ops
+
+
+def apply_op(engine, op: Op):
+    kind = op[0]
+    if kind == "undo":
+        engine.undo_last_round()
+    elif kind == "add":
+        # Igual que la UI: no se agregan manos a una partida terminada
+        if not engine.is_over:
+            engine.add_round(list(op[1]))
+    elif engine.rounds:
+        number = engine.rounds[0].number + int(op[1] * len(engine.rounds))
+        if kind == "edit":
+            engine.edit_round(number, list(op[2]))
+        else:
+            engine.delete_round(number)
+
+
+# ── Ejecución y achicamiento ───────────────────────────────────────────────────
+
+def first_mismatch(team_names: list[str], ops: list, candidate: Callable,
+                   reference: Callable = reference_engine) -> Optional[tuple]:
+    """Devuelve (paso, esperado, obtenido) del primer paso que difiere, o None."""
+    ref, alt = reference(team_names), candidate(team_names)
+    for step, op in enumerate(ops):
+        try:
+            apply_op(ref, op)
+            expected = observe(ref)
+        except Exception as e:
+            expected = ("excepción", type(e).__name__)
+        try:
+            apply_op(alt, op)
+            actual = observe(alt)
+        except Exception as e:
+            actual = ("excepción", type(e).__name__)
+        if expected != actual:
+            return step, expected, actual
+    if ops:
+        expected, actual = observe_history(ref), observe_history(alt)
+        if expected != actual:
+            return len(ops) - 1, expected, actual
+    return None
+
+
+def shrink(team_names: list[str], ops: list, candidate: Callable,
+           reference: Callable = reference_engine) -> list:
+    """Achica ops mientras la diferencia se siga reproduciendo."""
+    def fails(candidate_ops):
+        return first_mismatch(team_names, candidate_ops, candidate, reference) is not None
+
+    # El resto de la secuencia después del paso que falla no aporta nada
+    step = first_mismatch(team_names, ops, candidate, reference)[0]
+    ops = ops[:step + 1]
+
+    # 1) Sacar bloques de operaciones, cada vez más chicos
+    chunk = max(1, len(ops) // 2)
+    while chunk >= 1:
+        i = 0
+        while i < len(ops):
+            trial = ops[:i] + ops[i + chunk:]
+            if trial and fails(trial):
+                ops = trial
+            else:
+                i += chunk
+        chunk //= 2
+
+    # 2) Simplificar cada puntaje hacia los valores por defecto
+    for i, op in enumerate(ops):
+        if op[0] not in ("add", "edit"):
+            continue
+        for j, score in enumerate(op[-1]):
+            for field_name, value in vars(RoundScore(score.team_name)).items():
+                if getattr(ops[i][-1][j], field_name) == value:
+                    continue
+                scores = list(ops[i][-1])
+                scores[j] = replace(scores[j], **{field_name: value})
+                trial = ops[:i] + [ops[i][:-1] + (scores,)] + ops[i + 1:]
+                if fails(trial):
+                    ops = trial
+    return ops
+
+
+def fuzz(candidate: Callable, games: int = 1000, seed: int = 0, max_ops: int = 60,
+         reference: Callable = reference_engine, corrections: bool = True) -> Optional[Mismatch]:
+    """Juega `games` partidas al azar; devuelve la primera diferencia ya achicada."""
+    for g in range(games):
+        game_seed = seed + g
+        rng = random.Random(game_seed)
+        team_names = ["A", "B", "C"][:rng.choice((2, 2, 3))]
+        ops = random_ops(rng, team_names, rng.randint(1, max_ops), corrections)
+        if first_mismatch(team_names, ops, candidate, reference) is None:
+            continue
+        ops = shrink(team_names, ops, candidate, reference)
+        step, expected, actual = first_mismatch(team_names, ops, candidate, reference)
+        return Mismatch(game_seed, team_names, ops, step, expected, actual)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara un motor de puntaje contra la referencia.")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="paginado")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ops", type=int, default=60)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    factory, corrections = ENGINES[args.engine]
+    mismatch = fuzz(factory, args.games, args.seed, args.max_ops, corrections=corrections)
+    elapsed = time.perf_counter() - start
+    if mismatch:
+        print(mismatch.describe())
+        raise SystemExit(1)
+    print(f"OK: {args.games} partidas en {elapsed:.2f}s "
+          f"({args.games / elapsed:.0f} partidas/s), motor '{args.engine}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+events.py - Registro de eventos de una partida (auditoría y consultas en el tiempo)
+
+La partida en memoria (Game) sigue siendo la de siempre; EventLog se suscribe
+a sus cambios y guarda cada uno como un evento numerado:
+
+    game_created          equipos y reglas
+    round_added           mano agregada (con sus puntajes)
+    round_undone          mano deshecha (con los puntajes que se deshicieron)
+    round_edited          mano corregida (puntajes nuevos y anteriores)
+    round_deleted         mano borrada (con los puntajes que tenía)
+    rule_profile_changed  cambiaron el objetivo o los bonus
+
+Así queda constancia de lo que "Deshacer" y las correcciones borran de la
+partida. Cada SNAPSHOT_EVERY eventos se guarda un resumen del marcador
+(totales, cantidad de manos y ganador, sin las manos), de modo que
+state_at(seq) lo reconstruye en cualquier evento partiendo del resumen más
+cercano y repitiendo como mucho SNAPSHOT_EVERY eventos. Los eventos de manos
+llevan el ganador que quedó después del cambio: una corrección en el medio
+puede moverlo y con solo los totales no se lo podría volver a calcular.
+
+En disco (<partida>.events) se guarda una foto base y los eventos
+posteriores. compact() lleva la base hacia adelante: los eventos viejos se
+descartan, salvo las correcciones, que pasan a la lista de auditoría.
+"""
+
+import bisect
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from game import BONUS, TARGET_SCORE, Game, RoundScore
+from storage import atomic_write
+
+EVENTS_EXT = ".events"
+EVENTS_FORMAT = "buraco-events"
+EVENTS_VERSION = 1
+SNAPSHOT_EVERY = 100
+KEEP_EVENTS = 500  # eventos que quedan después de compactar
+
+CORRECTIONS = ("round_undone", "round_edited", "round_deleted", "rule_profile_changed")
+
+
+def events_path(journal_path: str) -> str:
+    """Archivo de eventos que acompaña a un diario (.bjl)."""
+    return os.path.splitext(journal_path)[0] + EVENTS_EXT
+
+
+def _score_dict(score: RoundScore) -> dict:
+    # Los campos son todos simples: copiar __dict__ alcanza y es mucho más rápido que asdict()
+    return dict(vars(score))
+
+
+def current_rules() -> dict:
+    return {"target_score": TARGET_SCORE, "bonus": dict(BONUS)}
+
+
+@dataclass(frozen=True)
+class Event:
+    seq: int
+    kind: str
+    data: dict
+    at: float
+
+    def to_dict(self) -> dict:
+        return {"seq": self.seq, "kind": self.kind, "at": self.at, "data": self.data}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Event":
+        return cls(data["seq"], data["kind"], data["data"], data["at"])
+
+    def describe(self) -> str:
+        data = self.data
+        subtotals = " / ".join(f"{RoundScore(**s).total:+}" for s in data.get("scores", ()))
+        if self.kind == "game_created":
+            return "Partida creada: " + " vs ".join(data["teams"])
+        if self.kind == "round_added":
+            return f"Mano {data['number']} agregada ({subtotals})"
+        if self.kind == "round_undone":
+            return f"Mano {data['number']} deshecha (tenía {subtotals})"
+        if self.kind == "round_edited":
+            before = " / ".join(f"{RoundScore(**s).total:+}" for s in data["previous"])
+            return f"Mano {data['number']} corregida ({before} → {subtotals})"
+        if self.kind == "round_deleted":
+            return f"Mano {data['number']} borrada (tenía {subtotals})"
+        if self.kind == "rule_profile_changed":
+            return f"Reglas cambiadas (objetivo {data['rules']['target_score']})"
+        return self.kind
+
+
+@dataclass
+class _State:
+    teams: list[str]
+    rules: dict
+    rounds: list[list[dict]] = field(default_factory=list)  # los dicts no se modifican
+
+    def copy(self) -> "_State":
+        return _State(list(self.teams), self.rules, list(self.rounds))
+
+    def apply(self, event: Event):
+        data = event.data
+        if event.kind == "game_created":
+            self.teams = list(data["teams"])
+            self.rules = data["rules"]
+            self.rounds = []
+        elif event.kind == "round_added":
+            self.rounds.append(data["scores"])
+        elif event.kind == "round_undone":
+            self.rounds.pop()
+        elif event.kind == "round_edited":
+            self.rounds[data["number"] - 1] = data["scores"]
+        elif event.kind == "round_deleted":
+            del self.rounds[data["number"] - 1]
+        elif event.kind == "rule_profile_changed":
+            self.rules = data["rules"]
+        else:
+            raise ValueError(f"Evento desconocido: {event.kind}")
+
+
+def _subtotals(scores: list[dict]) -> list[int]:
+    return [RoundScore(**s).total for s in scores]
+
+
+def _leader(teams: list[str], totals: list[int], target: int) -> tuple[Optional[str], bool]:
+    """Ganador entre los que llegaron a `target` (como Game._check_winner) y si fue por empate."""
+    reached = [i for i, total in enumerate(totals) if total >= target]
+    if not reached:
+        return None, False
+    return teams[max(reached, key=lambda i: totals[i])], len(reached) > 1
+
+
+@dataclass
+class Summary:
+    """El marcador después de un evento: totales y ganador, sin las manos."""
+    teams: list[str]
+    rules: dict
+    totals: list[int]
+    hands: int = 0
+    winner: Optional[str] = None
+    tied: bool = False
+
+    @classmethod
+    def from_state(cls, state: _State) -> "Summary":
+        summary = cls(list(state.teams), state.rules, [0] * len(state.teams))
+        for scores in state.rounds:
+            summary._add(_subtotals(scores))
+        return summary
+
+    def copy(self) -> "Summary":
+        return Summary(list(self.teams), self.rules, list(self.totals),
+                       self.hands, self.winner, self.tied)
+
+    def _add(self, subtotals: list[int], sign: int = 1):
+        self.totals = [t + sign * pts for t, pts in zip(self.totals, subtotals)]
+        self.hands += sign
+        # Primera mano que llega al objetivo: después de eso el ganador no cambia al agregar
+        if sign > 0 and self.winner is None:
+            self.winner, self.tied = _leader(self.teams, self.totals, self.rules["target_score"])
+
+    def apply(self, event: Event):
+        data = event.data
+        if event.kind == "game_created":
+            self.teams = list(data["teams"])
+            self.rules = data["rules"]
+            self.totals, self.hands, self.winner, self.tied = [0] * len(self.teams), 0, None, False
+            return
+        if event.kind == "rule_profile_changed":
+            self.rules = data["rules"]
+            return
+        if event.kind == "round_added":
+            self._add(_subtotals(data["scores"]))
+        elif event.kind in ("round_undone", "round_deleted"):
+            self._add(_subtotals(data["scores"]), -1)
+        elif event.kind == "round_edited":
+            self._add(_subtotals(data["previous"]), -1)
+            self._add(_subtotals(data["scores"]))
+        else:
+            raise ValueError(f"Evento desconocido: {event.kind}")
+        if "winner" in data:
+            self.winner, self.tied = data["winner"], data["tied"]
+        elif event.kind != "round_added":
+            # Registro sin ganador guardado: el que más tiene entre los que llegaron
+            self.winner, self.tied = _leader(self.teams, self.totals, self.rules["target_score"])
+
+
+class EventLog:
+    def __init__(self, team_names: list[str], snapshot_every: int = SNAPSHOT_EVERY):
+        self.snapshot_every = snapshot_every
+        self.events: list[Event] = []
+        self.audit: list[Event] = []  # correcciones anteriores a la base (ver compact)
+        self.game: Optional[Game] = None
+        self._base_seq = 0
+        # Manos completas solo de la base (para guardar) y del estado actual;
+        # las fotos intermedias son resúmenes de tamaño fijo
+        self._base = _State(list(team_names), current_rules())
+        self._state = self._base.copy()
+        self._summary = Summary.from_state(self._state)
+        self._snapshots: list[tuple[int, Summary]] = [(0, self._summary.copy())]
+        self.record("game_created", {"teams": list(team_names), "rules": current_rules()})
+
+    @classmethod
+    def from_game(cls, game: Game, snapshot_every: int = SNAPSHOT_EVERY) -> "EventLog":
+        """Registro nuevo para una partida que ya tiene manos (se cargan como agregadas)."""
+        if game.legacy_hands:
+            raise ValueError("La partida tiene manos sin detalle: no se pueden registrar.")
+        if game.is_paged:
+            raise ValueError("La partida tiene el historial paginado: no se registra.")
+        log = cls([t.name for t in game.teams], snapshot_every)
+        for rnd in game.rounds:
+            log.record("round_added", {"number": rnd.number,
+                                       "scores": [_score_dict(s) for s in rnd.scores]})
+        return log
+
+    @property
+    def last_seq(self) -> int:
+        return self.events[-1].seq if self.events else self._base_seq
+
+    # ── Registro ──────────────────────────────────────────────────────────────
+
+    def record(self, kind: str, data: dict) -> Event:
+        event = Event(self.last_seq + 1, kind, data, time.time())
+        self._state.apply(event)
+        self._summary.apply(event)
+        self.events.append(event)
+        if event.seq % self.snapshot_every == 0:
+            self._snapshots.append((event.seq, self._summary.copy()))
+        return event
+
+    def follow(self, game: Game):
+        """Registra de ahora en más los cambios de la partida."""
+        if self.game is not None:
+            self.game.remove_listener(self._on_change)
+        self.game = game
+        game.add_listener(self._on_change)
+
+    def unfollow(self):
+        if self.game is not None:
+            self.game.remove_listener(self._on_change)
+            self.game = None
+
+    def _on_change(self, game: Game, kind: str, number: int):
+        rules = current_rules()
+        if rules != self._state.rules:
+            self.record("rule_profile_changed", {"rules": rules})
+        outcome = {"winner": game.winner.name if game.winner else None,
+                   "tied": game.was_tied_win}
+        if kind == "add":
+            scores = [_score_dict(s) for s in game.rounds[-1].scores]
+            self.record("round_added", {"number": number, "scores": scores, **outcome})
+        elif kind == "undo":
+            self.record("round_undone", {"number": number, "scores": self._state.rounds[-1],
+                                         **outcome})
+        elif kind == "edit":
+            scores = [_score_dict(s) for s in game.rounds[number - 1].scores]
+            self.record("round_edited", {"number": number, "scores": scores,
+                                         "previous": self._state.rounds[number - 1], **outcome})
+        elif kind == "delete":
+            self.record("round_deleted", {"number": number,
+                                          "scores": self._state.rounds[number - 1], **outcome})
+
+    # ── Consultas ─────────────────────────────────────────────────────────────
+
+    def history(self) -> list[Event]:
+        """Todo lo que se conserva, en orden: correcciones compactadas y eventos."""
+        return self.audit + self.events
+
+    def state_at(self, seq: int) -> Summary:
+        """El marcador tal como estaba después del evento `seq`."""
+        if not self._base_seq <= seq <= self.last_seq:
+            raise ValueError(f"El evento {seq} no está en el registro "
+                             f"({self._base_seq}..{self.last_seq}).")
+        return self._summary_at(seq)
+
+    def matches(self, game: Game) -> bool:
+        """¿El estado actual del registro es esta partida?"""
+        if [t.name for t in game.teams] != self._state.teams or game.legacy_hands:
+            return False
+        if len(game.rounds) != len(self._state.rounds):
+            return False
+        return all([_score_dict(s) for s in rnd.scores] == scores
+                   for rnd, scores in zip(game.rounds, self._state.rounds))
+
+    # ── Compactación y disco ──────────────────────────────────────────────────
+
+    def compact(self, keep: int = KEEP_EVENTS):
+        """Deja solo los últimos `keep` eventos; la base pasa a ser el estado anterior."""
+        if len(self.events) <= keep:
+            return
+        cut = len(self.events) - keep
+        new_base = self.events[cut - 1].seq
+        summary = self._summary_at(new_base)
+        for event in self.events[:cut]:
+            self._base.apply(event)
+        self.audit.extend(e for e in self.events[:cut] if e.kind in CORRECTIONS)
+        del self.events[:cut]
+        self._base_seq = new_base
+        self._snapshots = [(new_base, summary)] + [s for s in self._snapshots if s[0] > new_base]
+
+    def _summary_at(self, seq: int) -> Summary:
+        """Resumen más cercano anterior a `seq` + los eventos que faltan (a lo sumo snapshot_every)."""
+        i = bisect.bisect_right(self._snapshots, seq, key=lambda snap: snap[0]) - 1
+        snap_seq, snap = self._snapshots[i]
+        summary = snap.copy()
+        for event in self.events[snap_seq - self._base_seq:seq - self._base_seq]:
+            summary.apply(event)
+        return summary
+
+    def save(self, path: str):
+        """Guarda el registro (compactándolo si creció demasiado)."""
+        if len(self.events) > 2 * KEEP_EVENTS:
+            self.compact()
+        base = self._base
+
+        def dump(obj) -> str:
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+        def write(f):
+            f.write(dump({
+                "format": EVENTS_FORMAT, "version": EVENTS_VERSION,
+                "base_seq": self._base_seq,
+                "base": {"teams": base.teams, "rules": base.rules, "rounds": base.rounds},
+                "audit": [e.to_dict() for e in self.audit],
+            }) + "\n")
+            for event in self.events:
+                f.write(dump(event.to_dict()) + "\n")
+
+        atomic_write(path, write)
+
+    @classmethod
+    def load(cls, path: str, snapshot_every: int = SNAPSHOT_EVERY) -> "EventLog":
+        with open(path, "r", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            if header.get("format") != EVENTS_FORMAT:
+                raise ValueError("No es un registro de eventos de Buraco.")
+            if header.get("version", 0) > EVENTS_VERSION:
+                raise ValueError("El registro es de una versión más nueva de la app.")
+            log = cls.__new__(cls)
+            log.snapshot_every = snapshot_every
+            log.events = []
+            log.audit = [Event.from_dict(e) for e in header["audit"]]
+            log.game = None
+            log._base_seq = header["base_seq"]
+            base = header["base"]
+            log._base = _State(base["teams"], base["rules"], base["rounds"])
+            log._state = log._base.copy()
+            log._summary = Summary.from_state(log._state)
+            log._snapshots = [(log._base_seq, log._summary.copy())]
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # escritura cortada
+                event = Event.from_dict(json.loads(line))
+                log._state.apply(event)
+                log._summary.apply(event)
+                log.events.append(event)
+                if event.seq % snapshot_every == 0:
+                    log._snapshots.append((event.seq, log._summary.copy()))
+        return log
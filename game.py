@@ -2,9 +2,16 @@
 game.py - Lógica del juego Buraco
 """
 
-from dataclasses import dataclass, field
-from typing import List, Optional
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, TypeVar
 import json
+import os
+import tempfile
+import traceback
+import uuid
+
+from score_index import ScoreIndex
 
 # ── Valores de las fichas ──────────────────────────────────────────────────────
 CARD_VALUES = {
@@ -25,6 +32,26 @@ BONUS = {
 
 TARGET_SCORE = 3000
 
+# ── Formato de diario (.bjl) ───────────────────────────────────────────────────
+# Primera línea: encabezado JSON con equipos, totales y estado de la partida.
+# Líneas siguientes: una mano por línea, para poder leerlas de a partes.
+JOURNAL_EXT = ".bjl"
+JOURNAL_FORMAT = "buraco-journal"
+JOURNAL_VERSION = 1
+
+# Manos que quedan en memoria en una partida larga (liga); las anteriores se
+# paginan a disco (ver RoundHistory)
+LONG_GAME_RESIDENT_ROUNDS = 500
+
+
+def rules_signature() -> tuple:
+    """
+    Identifica las reglas de puntaje vigentes (objetivo y bonus). Los cachés
+    que dependen de las reglas la reciben como argumento, así forma parte de
+    su clave y un resultado no se reutiliza si cambian los bonus.
+    """
+    return (TARGET_SCORE, tuple(sorted(BONUS.items())))
+
 
 @dataclass
 class RoundScore:
@@ -49,35 +76,76 @@ class RoundScore:
             pts += BONUS["muerto"] if self.muerto_bought else -BONUS["muerto"]
         return pts
 
+    @property
+    def key(self) -> tuple:
+        """Los campos que definen el puntaje (sin el nombre), como clave inmutable."""
+        return (self.cards_down, self.cards_remaining, self.cierre, self.canastas_puras,
+                self.canastas_impuras, self.muerto_bought, self.muerto_available)
+
     def breakdown(self) -> str:
-        lines = [
-            f"  Fichas bajadas:     +{self.cards_down}",
-            f"  Fichas en mano:     -{self.cards_remaining}",
-        ]
-        if self.cierre:
-            lines.append(f"  Cierre:             +{BONUS['cierre']}")
-        if self.canastas_puras:
-            lines.append(f"  Canastas puras x{self.canastas_puras}: +{self.canastas_puras * BONUS['canasta_pura']}")
-        if self.canastas_impuras:
-            lines.append(f"  Canastas impuras x{self.canastas_impuras}: +{self.canastas_impuras * BONUS['canasta_impura']}")
-        if self.muerto_available:
-            if self.muerto_bought:
-                lines.append(f"  Muerto comprado:    +{BONUS['muerto']}")
-            else:
-                lines.append(f"  Muerto NO comprado: -{BONUS['muerto']}")
-        lines.append(f"  ─────────────────────────")
-        lines.append(f"  SUBTOTAL:           {self.total:+}")
-        return "\n".join(lines)
+        return _breakdown_text(self.key, rules_signature())
+
+
+# ── Textos de detalle (memorizados por puntaje y reglas) ───────────────────────
+
+@lru_cache(maxsize=4096)
+def _breakdown_text(key: tuple, rules: tuple) -> str:
+    score = RoundScore("", *key)
+    lines = [
+        f"  Fichas bajadas:     +{score.cards_down}",
+        f"  Fichas en mano:     -{score.cards_remaining}",
+    ]
+    if score.cierre:
+        lines.append(f"  Cierre:             +{BONUS['cierre']}")
+    if score.canastas_puras:
+        lines.append(f"  Canastas puras x{score.canastas_puras}: +{score.canastas_puras * BONUS['canasta_pura']}")
+    if score.canastas_impuras:
+        lines.append(f"  Canastas impuras x{score.canastas_impuras}: +{score.canastas_impuras * BONUS['canasta_impura']}")
+    if score.muerto_available:
+        if score.muerto_bought:
+            lines.append(f"  Muerto comprado:    +{BONUS['muerto']}")
+        else:
+            lines.append(f"  Muerto NO comprado: -{BONUS['muerto']}")
+    lines.append(f"  ─────────────────────────")
+    lines.append(f"  SUBTOTAL:           {score.total:+}")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=2048)
+def _hand_text(hand: tuple, rules: tuple) -> str:
+    return "\n\n".join(f"{name}\n{_breakdown_text(key, rules)}" for name, key in hand)
+
+
+def hand_breakdown(scores: List[RoundScore]) -> str:
+    """Detalle de una mano para todos los equipos (texto de los tooltips del historial)."""
+    return _hand_text(tuple((s.team_name, s.key) for s in scores), rules_signature())
 
 
 @dataclass
 class Team:
     name: str
     scores: List[int] = field(default_factory=list)
+    # Agregado de los puntajes que ya no están en memoria (historial paginado)
+    base_total: int = 0
+    base_count: int = 0
 
     @property
     def total(self) -> int:
-        return sum(self.scores)
+        return self.base_total + sum(self.scores)
+
+    def spill(self, count: int) -> List[int]:
+        """Saca de memoria los `count` puntajes más viejos y los suma al agregado."""
+        spilled = self.scores[:count]
+        del self.scores[:count]
+        self.base_total += sum(spilled)
+        self.base_count += len(spilled)
+        return spilled
+
+    def restore(self, spilled: List[int]):
+        """Inverso de spill(): vuelve a poner en memoria los puntajes de una página."""
+        self.scores[:0] = spilled
+        self.base_total -= sum(spilled)
+        self.base_count -= len(spilled)
 
     @property
     def has_won(self) -> bool:
@@ -89,23 +157,153 @@ class Round:
     number: int
     scores: List[RoundScore] = field(default_factory=list)
 
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Round":
+        return cls(data["number"], [RoundScore(**s) for s in data["scores"]])
+
+
+class RoundHistory:
+    """
+    Historial de manos con memoria acotada.
+
+    Solo las últimas `max_resident` manos quedan en memoria; cuando se supera
+    ese límite, las `page_size` más viejas se escriben como una página en un
+    archivo temporal. Se comporta como una lista (len, iteración, índices,
+    append, pop) y las páginas se vuelven a leer de disco cuando se las pide.
+    Cada página guarda además los puntajes de los equipos que se sacaron de
+    memoria junto con ella, para poder restaurarlos al deshacer.
+    """
+
+    def __init__(self, max_resident: int, page_size: Optional[int] = None):
+        if max_resident < 1:
+            raise ValueError("max_resident debe ser al menos 1.")
+        self.max_resident = max_resident
+        self.page_size = min(page_size or max_resident, max_resident)
+        self.resident: List[Round] = []
+        self._file = tempfile.TemporaryFile()
+        self._pages: List[tuple[int, int, int]] = []  # (offset, bytes, manos)
+        self._spilled = 0
+        self._cache: tuple[int, List[Round]] | None = None  # última página leída
+
+    def __len__(self) -> int:
+        return self._spilled + len(self.resident)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[Round]:
+        for page_idx in range(len(self._pages)):
+            yield from self._read_page(page_idx)
+        yield from list(self.resident)
+
+    def __getitem__(self, index: int) -> Round:
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("índice de mano fuera de rango")
+        if index >= self._spilled:
+            return self.resident[index - self._spilled]
+        # Las páginas tienen todas page_size manos
+        page_idx, offset = divmod(index, self.page_size)
+        return self._read_page(page_idx)[offset]
+
+    @property
+    def needs_spill(self) -> bool:
+        return len(self.resident) > self.max_resident
+
+    @property
+    def has_pages(self) -> bool:
+        return bool(self._pages)
+
+    def append(self, rnd: Round):
+        self.resident.append(rnd)
+
+    def pop(self) -> Round:
+        if not self.resident:
+            raise IndexError("no hay manos en memoria; usar unspill() primero")
+        return self.resident.pop()
+
+    def spill(self, team_scores: List[List[int]]):
+        """Escribe las page_size manos más viejas en disco junto con team_scores."""
+        rounds = self.resident[:self.page_size]
+        del self.resident[:self.page_size]
+        payload = json.dumps({
+            "rounds": [r.to_dict() for r in rounds],
+            "team_scores": team_scores,
+        }, ensure_ascii=False).encode("utf-8")
+        offset = self._pages[-1][0] + self._pages[-1][1] if self._pages else 0
+        self._file.seek(offset)
+        self._file.write(payload)
+        self._pages.append((offset, len(payload), len(rounds)))
+        self._spilled += len(rounds)
+
+    def unspill(self) -> List[List[int]]:
+        """Trae a memoria la última página y devuelve los puntajes de equipo guardados."""
+        page_idx = len(self._pages) - 1
+        data = self._load_payload(page_idx)
+        offset, _size, count = self._pages.pop()
+        self._file.truncate(offset)
+        self._spilled -= count
+        self._cache = None
+        self.resident[:0] = [Round.from_dict(r) for r in data["rounds"]]
+        return data["team_scores"]
+
+    def iter_team_scores(self) -> Iterator[List[int]]:
+        """Puntajes de equipo guardados en cada página, de la más vieja a la más nueva."""
+        for page_idx in range(len(self._pages)):
+            yield self._load_payload(page_idx)["team_scores"]
+
+    def close(self):
+        self._file.close()
+
+    def _load_payload(self, page_idx: int) -> dict:
+        offset, size, _count = self._pages[page_idx]
+        self._file.seek(offset)
+        return json.loads(self._file.read(size).decode("utf-8"))
+
+    def _read_page(self, page_idx: int) -> List[Round]:
+        if self._cache is not None and self._cache[0] == page_idx:
+            return self._cache[1]
+        rounds = [Round.from_dict(r) for r in self._load_payload(page_idx)["rounds"]]
+        self._cache = (page_idx, rounds)
+        return rounds
+
 
 class Game:
-    def __init__(self, team_names: list[str]):
+    def __init__(self, team_names: list[str], max_resident_rounds: Optional[int] = None):
         """
         team_names: lista de 2 o 3 nombres (equipos o jugadores individuales).
         - 2 nombres → partida de 2 equipos/jugadores
         - 3 nombres → partida de 3 jugadores individuales
         Para 4 jugadores se usan 2 nombres de equipo (equipos de 2).
+        max_resident_rounds: si se indica, solo esa cantidad de manos queda en
+        memoria y las anteriores se paginan a disco (ver RoundHistory). Lo
+        que sigue creciendo con la partida son los acumulados: el índice
+        (`index`) y el gráfico guardan unos pocos enteros por mano y equipo,
+        en lugar de las manos completas. Las manos paginadas no se pueden
+        corregir ni borrar (solo deshacer la última).
         """
         if len(team_names) < 2 or len(team_names) > 3:
             raise ValueError("Se requieren 2 o 3 participantes.")
         self.teams: List[Team] = [Team(n) for n in team_names]
-        self.rounds: List[Round] = []
+        # Identificador estable: se guarda con la partida y no cambia al reabrirla
+        self.game_id = uuid.uuid4().hex
+        self.rounds: List[Round] | RoundHistory = (
+            RoundHistory(max_resident_rounds) if max_resident_rounds else []
+        )
         self.current_round = 1
         self.winner: Optional[Team] = None
         # Indica si la victoria fue por empate en 3000+ (para el mensaje de UI)
         self.was_tied_win: bool = False
+        # Manos del diario todavía sin leer (ver load_header / hydrate)
+        self.pending_hands = 0
+        # Índice de acumulados; se arma la primera vez que se lo pide
+        self._index: Optional[ScoreIndex] = None
+        self._listeners: List[Callable[["Game", str, int], None]] = []
 
     @property
     def num_teams(self) -> int:
@@ -115,18 +313,85 @@ class Game:
     def is_over(self) -> bool:
         return self.winner is not None
 
+    @property
+    def is_loading(self) -> bool:
+        return self.pending_hands > 0
+
+    @property
+    def is_paged(self) -> bool:
+        return isinstance(self.rounds, RoundHistory)
+
+    @property
+    def max_resident_rounds(self) -> Optional[int]:
+        return self.rounds.max_resident if self.is_paged else None
+
+    def close(self):
+        """Libera el archivo de páginas del historial paginado (si lo hay)."""
+        if self.is_paged:
+            self.rounds.close()
+
+    @property
+    def legacy_hands(self) -> int:
+        """Manos al principio de la partida que solo tienen totales (sin detalle)."""
+        return self.teams[0].base_count + len(self.teams[0].scores) - len(self.rounds)
+
+    @property
+    def index(self) -> ScoreIndex:
+        if self._index is None:
+            self._index = ScoreIndex([self.all_scores(i) for i in range(self.num_teams)])
+        return self._index
+
+    # ── Avisos de cambios ─────────────────────────────────────────────────────
+
+    def add_listener(self, listener: Callable[["Game", str, int], None]):
+        """
+        listener(game, evento, número de mano) se llama después de cada cambio.
+        Eventos: "add", "undo", "edit" y "delete". Sus errores se informan en
+        stderr y no llegan a quien hizo el cambio.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[["Game", str, int], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event: str, number: int):
+        # El cambio ya está hecho: un oyente que falla se informa, pero no lo
+        # interrumpe ni deja sin aviso a los demás
+        for listener in list(self._listeners):
+            try:
+                listener(self, event, number)
+            except Exception:
+                traceback.print_exc()
+
     def add_round(self, scores: list[RoundScore]):
         """Registra los puntajes de una mano. scores debe tener un elemento por equipo."""
         if len(scores) != self.num_teams:
             raise ValueError(f"Se esperaban {self.num_teams} puntajes, se recibieron {len(scores)}.")
+        # Los totales primero: si un puntaje es inválido, la partida queda como estaba
+        totals = [s.total for s in scores]
         r = Round(self.current_round, list(scores))
         self.rounds.append(r)
-        for team, score in zip(self.teams, scores):
-            team.scores.append(score.total)
+        for team, pts in zip(self.teams, totals):
+            team.scores.append(pts)
+        if self._index is not None:
+            self._index.append(totals)
         self.current_round += 1
-        self._check_winner()
+        self._spill()
+        # Si ya había ganador, la primera mano que llegó a TARGET_SCORE sigue siendo esa
+        if self.winner is None:
+            self._check_winner()
+        self._notify("add", r.number)
+
+    def _spill(self):
+        """Pasa a disco las manos que exceden max_resident_rounds."""
+        if self.is_paged:
+            while self.rounds.needs_spill:
+                count = self.rounds.page_size
+                self.rounds.spill([t.spill(count) for t in self.teams])
 
     def _check_winner(self):
+        """Ganador de la última mano, si es la primera en la que alguien llegó a TARGET_SCORE."""
         winners = [t for t in self.teams if t.has_won]
         if not winners:
             return
@@ -142,39 +407,301 @@ class Game:
     def undo_last_round(self):
         if not self.rounds:
             return
-        self.rounds.pop()
+        if self.is_paged and not self.rounds.resident:
+            for team, spilled in zip(self.teams, self.rounds.unspill()):
+                team.restore(spilled)
+        number = self.rounds.pop().number
         for team in self.teams:
             if team.scores:
                 team.scores.pop()
+        if self._index is not None:
+            self._index.pop()
         self.current_round -= 1
+        # Sin ganador, sacar una mano no crea uno; con ganador, puede que fuera esa mano
+        if self.winner is not None:
+            self._rederive_winner()
+        self._notify("undo", number)
+
+    # ── Corrección de manos anteriores ────────────────────────────────────────
+
+    def _round_position(self, number: int) -> int:
+        if self.is_paged:
+            raise ValueError("No se pueden corregir manos con el historial paginado.")
+        # Las manos con detalle están numeradas de corrido desde la primera
+        pos = number - self.rounds[0].number if self.rounds else -1
+        if not 0 <= pos < len(self.rounds):
+            raise ValueError(f"No existe la mano #{number}.")
+        return pos
+
+    def edit_round(self, number: int, scores: list[RoundScore]):
+        """Reemplaza los puntajes de la mano `number` y vuelve a determinar el ganador."""
+        if len(scores) != self.num_teams:
+            raise ValueError(f"Se esperaban {self.num_teams} puntajes, se recibieron {len(scores)}.")
+        totals = [s.total for s in scores]
+        pos = self._round_position(number)
+        self.rounds[pos].scores = list(scores)
+        hand = self.legacy_hands + pos
+        for team, pts in zip(self.teams, totals):
+            team.scores[hand] = pts
+        self.index.set(hand, totals)
+        self._rederive_winner()
+        self._notify("edit", number)
+
+    def delete_round(self, number: int):
+        """Borra la mano `number`; las siguientes se renumeran."""
+        pos = self._round_position(number)
+        hand = self.legacy_hands + pos
+        del self.rounds[pos]
+        for rnd in self.rounds[pos:]:
+            rnd.number -= 1
+        for team in self.teams:
+            del team.scores[hand]
+        self.current_round -= 1
+        self._index = None  # borrar del medio corre todas las posiciones: se rearma
+        self._rederive_winner()
+        self._notify("delete", number)
+
+    def _rederive_winner(self):
+        """
+        Ganador según la primera mano en la que alguien llegó a TARGET_SCORE.
+        Si en esa mano llegaron varios, gana el de mayor puntaje en ese momento.
+        """
         self.winner = None
         self.was_tied_win = False
-        self._check_winner()
+        crossing = self.index.first_crossing(TARGET_SCORE)
+        if crossing is None:
+            return
+        k, reached = crossing
+        best = max(reached, key=lambda i: self.index.score_after(i, k))
+        self.winner = self.teams[best]
+        self.was_tied_win = len(reached) > 1
+
+    def all_scores(self, team_idx: int) -> List[int]:
+        """Todos los puntajes por mano de un equipo, incluyendo los paginados a disco."""
+        team = self.teams[team_idx]
+        if not self.is_paged:
+            return list(team.scores)
+        scores: List[int] = []
+        for page in self.rounds.iter_team_scores():
+            scores.extend(page[team_idx])
+        return scores + team.scores
 
     def to_dict(self) -> dict:
         return {
-            "teams": [{"name": t.name, "scores": t.scores} for t in self.teams],
+            "teams": [{"name": t.name, "scores": self.all_scores(i)}
+                      for i, t in enumerate(self.teams)],
             "current_round": self.current_round,
             "winner": self.winner.name if self.winner else None,
+            "game_id": self.game_id,
+            **self._paging_header(),
+        }
+
+    def _paging_header(self) -> dict:
+        # Solo las partidas paginadas lo guardan: al abrirlas se vuelven a paginar
+        return {"max_resident_rounds": self.max_resident_rounds} if self.is_paged else {}
+
+    def journal_header(self) -> dict:
+        return {
+            "format": JOURNAL_FORMAT,
+            "version": JOURNAL_VERSION,
+            "teams": [{"name": t.name, "total": t.total} for t in self.teams],
+            "hands": self.teams[0].base_count + len(self.teams[0].scores),
+            "current_round": self.current_round,
+            "winner": self.winner.name if self.winner else None,
+            "tied": self.was_tied_win,
+            "game_id": self.game_id,
+            "rules": {"target_score": TARGET_SCORE, "bonus": BONUS},
+            **self._paging_header(),
         }
 
     def save(self, filepath: str):
+        if self.is_loading:
+            raise ValueError("La partida todavía se está cargando.")
+        if filepath.endswith(JOURNAL_EXT):
+            self.save_journal(filepath)
+            return
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
 
+    def save_journal(self, filepath: str):
+        """Guarda en formato diario: encabezado + una línea por mano."""
+        with open(filepath, "w", encoding="utf-8") as f:
+            self.write_journal(f)
+
+    def write_journal(self, f, extra_header: Optional[dict] = None):
+        """Escribe el diario en un archivo de texto ya abierto."""
+        def dump(obj) -> str:
+            return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+        f.write(dump({**self.journal_header(), **(extra_header or {})}) + "\n")
+        # Manos sin detalle (p. ej. cargadas de un .json): solo totales
+        legacy = self.legacy_hands
+        if legacy:
+            columns = [self.all_scores(i)[:legacy] for i in range(self.num_teams)]
+            for totals in zip(*columns):
+                f.write(dump({"totals": list(totals)}) + "\n")
+        for rnd in self.rounds:
+            f.write(dump(rnd.to_dict()) + "\n")
+
+    @classmethod
+    def load_header(cls, filepath: str,
+                    max_resident_rounds: Optional[int] = None) -> tuple["Game", "JournalReader"]:
+        """
+        Lee solo el encabezado de un diario. La partida queda con los totales
+        correctos y las manos pendientes se incorporan con hydrate(), leyendo
+        los lotes del JournalReader devuelto. Si no se indica
+        max_resident_rounds, se usa el que se guardó con la partida.
+        """
+        reader = JournalReader(filepath)
+        header = reader.header
+        g = cls([t["name"] for t in header["teams"]],
+                max_resident_rounds or header.get("max_resident_rounds"))
+        for team, team_data in zip(g.teams, header["teams"]):
+            team.base_total = team_data["total"]
+            team.base_count = header["hands"]
+        g.game_id = header.get("game_id", g.game_id)
+        g.current_round = header["current_round"]
+        g.pending_hands = header["hands"]
+        # Mientras se cargan las manos vale el ganador guardado; hydrate() lo confirma al final
+        winner = header.get("winner")
+        if winner is not None:
+            g.winner = next((t for t in g.teams if t.name == winner), None)
+            g.was_tied_win = header.get("tied", False)
+        return g, reader
+
+    def hydrate(self, hands: list[dict]) -> List[Round]:
+        """Incorpora manos leídas del diario; devuelve las que tienen detalle."""
+        self._index = None
+        new_rounds = []
+        for hand in hands:
+            if "scores" in hand:
+                rnd = Round.from_dict(hand)
+                self.rounds.append(rnd)
+                new_rounds.append(rnd)
+                totals = [s.total for s in rnd.scores]
+            else:
+                totals = hand["totals"]
+            for team, pts in zip(self.teams, totals):
+                team.scores.append(pts)
+                team.base_total -= pts
+                team.base_count -= 1
+            self.pending_hands -= 1
+            self._spill()
+        if not self.is_loading:
+            self._rederive_winner()
+        return new_rounds
+
+    def hydrate_all(self, reader: "JournalReader"):
+        """Incorpora todas las manos del diario; falla si el archivo quedó cortado."""
+        with reader:
+            for batch in reader.iter_batches():
+                self.hydrate(batch)
+        if self.is_loading:
+            self.close()
+            raise ValueError("El diario está incompleto: faltan manos.")
+
     @classmethod
-    def load(cls, filepath: str) -> "Game":
+    def load(cls, filepath: str, max_resident_rounds: Optional[int] = None) -> "Game":
+        if JournalReader.is_journal(filepath):
+            g, reader = cls.load_header(filepath, max_resident_rounds)
+            g.hydrate_all(reader)
+            return g
         with open(filepath, "r", encoding="utf-8") as f:
             data = json.load(f)
         teams = data["teams"]
-        g = cls([t["name"] for t in teams])
+        # El .json solo tiene los totales por mano: no hay detalle que paginar,
+        # pero la partida conserva la opción para las manos que se agreguen
+        g = cls([t["name"] for t in teams], max_resident_rounds or data.get("max_resident_rounds"))
         for team_obj, team_data in zip(g.teams, teams):
             team_obj.scores = team_data["scores"]
+        g.game_id = data.get("game_id", g.game_id)
         g.current_round = data["current_round"]
-        g._check_winner()
+        g._rederive_winner()
         return g
 
 
+class JournalReader:
+    """Lector incremental de un diario .bjl: primero el encabezado, después las manos por lotes."""
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, filepath: str):
+        self._file = open(filepath, "r", encoding="utf-8")
+        try:
+            self.header = json.loads(self._file.readline())
+        except json.JSONDecodeError:
+            self._file.close()
+            raise ValueError("El archivo no es un diario de Buraco.")
+        if self.header.get("format") != JOURNAL_FORMAT:
+            self._file.close()
+            raise ValueError("El archivo no es un diario de Buraco.")
+        if self.header.get("version", 0) > JOURNAL_VERSION:
+            self._file.close()
+            raise ValueError("El diario fue guardado por una versión más nueva.")
+
+    @staticmethod
+    def is_journal(filepath: str) -> bool:
+        with open(filepath, "r", encoding="utf-8") as f:
+            first = f.readline()
+        try:
+            header = json.loads(first)
+        except json.JSONDecodeError:
+            return False
+        return isinstance(header, dict) and header.get("format") == JOURNAL_FORMAT
+
+    def iter_batches(self, chunk_size: Optional[int] = None) -> Iterator[list[dict]]:
+        """Lee el archivo en bloques de chunk_size caracteres y devuelve las manos completas de cada bloque."""
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        rest = ""
+        while True:
+            chunk = self._file.read(chunk_size)
+            if not chunk:
+                break
+            lines = (rest + chunk).split("\n")
+            rest = lines.pop()
+            batch = [json.loads(line) for line in lines if line.strip()]
+            if batch:
+                yield batch
+        if rest.strip():
+            yield [json.loads(rest)]
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+
+# ── Carpetas de partidas ───────────────────────────────────────────────────────
+
+# Lo que falla al leer un archivo que no es una partida (o está dañado)
+ARCHIVE_ERRORS = (OSError, ValueError, KeyError, TypeError)
+
+T = TypeVar("T")
+
+
+def iter_archive(folder: str, read: Callable[[str], T],
+                 by_mtime: bool = False) -> Iterator[tuple[str, T]]:
+    """
+    (ruta, read(ruta)) para cada partida guardada (.json y .bjl) de la
+    carpeta, por nombre o, con by_mtime, de la más vieja a la más nueva. Los
+    archivos que read() no puede leer se saltean.
+    """
+    paths = [os.path.join(folder, name) for name in sorted(os.listdir(folder))
+             if name.endswith((".json", JOURNAL_EXT))]
+    if by_mtime:
+        paths.sort(key=os.path.getmtime)
+    for path in paths:
+        try:
+            result = read(path)
+        except ARCHIVE_ERRORS:
+            continue  # no es una partida de Buraco
+        yield path, result
+
+
 # ── Calculadora de fichas ──────────────────────────────────────────────────────
 def calculate_cards(cards: dict) -> int:
     total = 0
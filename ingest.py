@@ -0,0 +1,319 @@
+"""
+ingest.py - Carga de manos por flujo (stdin / pipe)
+
+Para pasar planillas de papel o conectar otras herramientas: lee manos desde
+la entrada estándar en bloques grandes, las juega con Game.add_round (con la
+misma detección de ganador que la app) y escribe en la salida estándar una
+línea JSON por evento:
+
+    {"game": "mesa1", "hand": 3, "totals": [850, 420]}
+    {"game": "mesa1", "event": "game_over", "hand": 31, "winner": "Ana", "tied": false, "totals": [...]}
+    {"game": "mesa1", "event": "error", "line": 57, "error": "..."}
+
+Formatos de entrada (una mano por línea, con todos los equipos):
+
+    jsonl  {"game": "mesa1", "scores": [{"team_name": "Ana", "cards_down": 120, ...}, ...]}
+    csv    mesa1,Ana,120,30,1,1,0,1,1,Beto,80,20,0,0,1,0,1
+           (por equipo: nombre, bajadas, en mano, cierre, puras, impuras,
+            muerto comprado, muerto disponible; encabezado "game,..." opcional)
+    text   mesa1;Ana:120/30 C P1 M;Beto:80/20 I1
+           (C cierre, P<n> puras, I<n> impuras, M muerto comprado, X sin muerto)
+
+La partida se crea con los equipos de su primera mano. Con --workers N las
+partidas se reparten por id entre N procesos; el orden se mantiene dentro
+de cada partida.
+
+Uso:
+    python ingest.py --format text < planillas.txt > eventos.jsonl
+"""
+
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+import zlib
+from dataclasses import fields
+from typing import Iterable, Iterator, Optional
+
+from game import Game, RoundScore
+
+CHUNK_BYTES = 1 << 20
+BATCH_LINES = 4096
+FORMATS = ("jsonl", "csv", "text")
+CSV_FIELDS = 8  # campos por equipo
+
+_TRUE = {"1", "true", "si", "sí", "x", "s", "yes", "y"}
+_JSON_GAME = re.compile(r'"game"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+# ── Lectura por bloques ───────────────────────────────────────────────────────
+
+def read_lines(stream, chunk_bytes: int = CHUNK_BYTES) -> Iterator[list[str]]:
+    """Lotes de líneas completas leídas de a chunk_bytes (stream binario)."""
+    rest = b""
+    while True:
+        chunk = stream.read(chunk_bytes)
+        if not chunk:
+            break
+        chunk = rest + chunk
+        cut = chunk.rfind(b"\n") + 1
+        rest = chunk[cut:]
+        if cut:
+            yield chunk[:cut].decode("utf-8").splitlines()
+    if rest:
+        yield rest.decode("utf-8").splitlines()
+
+
+def detect_format(line: str) -> str:
+    line = line.lstrip()
+    if line.startswith("{"):
+        return "jsonl"
+    if ";" in line and ":" in line:
+        return "text"
+    return "csv"
+
+
+# ── Formatos ──────────────────────────────────────────────────────────────────
+
+def _flag(value: str) -> bool:
+    return value.strip().lower() in _TRUE
+
+
+def _score_from_json(data: dict) -> RoundScore:
+    """RoundScore con tipos estrictos: "false" no es un bool ni "10" un entero."""
+    if not isinstance(data, dict):
+        raise ValueError("Cada puntaje tiene que ser un objeto.")
+    types = {f.name: f.type for f in fields(RoundScore)}
+    for key, value in data.items():
+        if key not in types:
+            raise ValueError(f"Campo desconocido '{key}'.")
+        if type(value) is not types[key]:  # type() y no isinstance: True no pasa por int
+            raise ValueError(f"'{key}' tiene que ser {types[key].__name__}, no {value!r}.")
+    if "team_name" not in data:
+        raise ValueError("Falta 'team_name'.")
+    return RoundScore(**data)
+
+
+def parse_jsonl(line: str) -> tuple[str, list[RoundScore]]:
+    data = json.loads(line)
+    return str(data["game"]), [_score_from_json(s) for s in data["scores"]]
+
+
+def parse_csv_row(row: list[str]) -> tuple[str, list[RoundScore]]:
+    fields = len(row) - 1
+    if fields <= 0 or fields % CSV_FIELDS:
+        raise ValueError(f"Se esperaban {CSV_FIELDS} campos por equipo, hay {fields}.")
+    scores = []
+    for i in range(1, len(row), CSV_FIELDS):
+        name, down, remaining, cierre, puras, impuras, bought, available = row[i:i + CSV_FIELDS]
+        scores.append(RoundScore(name.strip(), int(down), int(remaining), _flag(cierre),
+                                 int(puras), int(impuras), _flag(bought), _flag(available)))
+    return row[0].strip(), scores
+
+
+def parse_text(line: str) -> tuple[str, list[RoundScore]]:
+    game_id, *teams = line.split(";")
+    if not teams:
+        raise ValueError("Falta el puntaje de los equipos.")
+    scores = []
+    for part in teams:
+        name, sep, rest = part.rpartition(":")
+        if not sep:
+            raise ValueError(f"Equipo sin ':' en '{part.strip()}'.")
+        points, *flags = rest.split()
+        down, _, remaining = points.partition("/")
+        score = RoundScore(name.strip(), int(down), int(remaining or 0))
+        for flag in flags:
+            kind, count = flag[0].upper(), flag[1:]
+            if kind == "C":
+                score.cierre = True
+            elif kind == "M":
+                score.muerto_bought = True
+            elif kind == "X":
+                score.muerto_available = False
+            elif kind == "P":
+                score.canastas_puras = int(count or 1)
+            elif kind == "I":
+                score.canastas_impuras = int(count or 1)
+            else:
+                raise ValueError(f"Marca desconocida '{flag}'.")
+        scores.append(score)
+    return game_id.strip(), scores
+
+
+def game_id_of(line: str, fmt: str) -> str:
+    """Id de la partida sin procesar la línea entera (para repartir entre procesos)."""
+    if fmt == "jsonl":
+        match = _JSON_GAME.search(line)
+        return match.group(1) if match else ""
+    return line.split(";" if fmt == "text" else ",", 1)[0].strip().strip('"')
+
+
+# ── Juego ─────────────────────────────────────────────────────────────────────
+
+def _dump(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class Ingestor:
+    """Juega las manos que llegan y acumula los eventos de salida."""
+
+    def __init__(self, fmt: str, only_final: bool = False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato desconocido: {fmt}")
+        self.fmt = fmt
+        self.only_final = only_final
+        self.games: dict[str, Game] = {}
+        self.finished: set[str] = set()  # las terminadas no se guardan en memoria
+        self.hands = 0
+        self.errors = 0
+
+    def feed(self, lines: list[str], first_line: int = 1,
+             numbers: Optional[list[int]] = None) -> list[str]:
+        """Procesa un lote; devuelve las líneas JSON de salida."""
+        out: list[str] = []
+        numbers = numbers or range(first_line, first_line + len(lines))
+        if self.fmt == "csv":
+            records: Iterable = csv.reader(lines)
+            parse = parse_csv_row
+        else:
+            records = lines
+            parse = parse_jsonl if self.fmt == "jsonl" else parse_text
+        for number, record in zip(numbers, records):
+            if not record or (self.fmt != "csv" and not record.strip()):
+                continue
+            if self.fmt == "csv" and record[0].strip().lower() == "game":
+                continue  # encabezado
+            game_id = None
+            try:
+                game_id, scores = parse(record)
+                self._play(game_id, scores, out)
+            except (ValueError, KeyError, TypeError) as e:
+                self.errors += 1
+                out.append(_dump({"game": game_id, "event": "error", "line": number, "error": str(e)}))
+        return out
+
+    def _play(self, game_id: str, scores: list[RoundScore], out: list[str]):
+        if game_id in self.finished:
+            raise ValueError(f"La partida '{game_id}' ya terminó.")
+        game = self.games.get(game_id)
+        names = [s.team_name for s in scores]
+        if game is None:
+            game = self.games[game_id] = Game(names)
+        elif [t.name for t in game.teams] != names:
+            raise ValueError(f"Los equipos de '{game_id}' no coinciden con su primera mano.")
+        game.add_round(scores)
+        self.hands += 1
+        totals = [t.total for t in game.teams]
+        hand = game.current_round - 1
+        if not self.only_final:
+            out.append(_dump({"game": game_id, "hand": hand, "totals": totals}))
+        if game.is_over:
+            out.append(_dump({"game": game_id, "event": "game_over", "hand": hand,
+                              "winner": game.winner.name, "tied": game.was_tied_win,
+                              "totals": totals}))
+            del self.games[game_id]
+            self.finished.add(game_id)
+
+
+# ── Procesos ──────────────────────────────────────────────────────────────────
+
+def _worker(fmt: str, only_final: bool, inbox, outbox):
+    ingestor = Ingestor(fmt, only_final)
+    while True:
+        batch = inbox.get()
+        if batch is None:
+            break
+        numbers, lines = batch
+        outbox.put((ingestor.feed(lines, numbers=numbers), 0, 0))
+    outbox.put((None, ingestor.hands, ingestor.errors))
+
+
+def run_sharded(batches: Iterable[list[str]], fmt: str, workers: int,
+                only_final: bool, write) -> tuple[int, int]:
+    """Reparte las líneas por id de partida entre `workers` procesos."""
+    import multiprocessing
+    outbox = multiprocessing.Queue()
+    inboxes = [multiprocessing.Queue(maxsize=8) for _ in range(workers)]
+    procs = [multiprocessing.Process(target=_worker, args=(fmt, only_final, q, outbox), daemon=True)
+             for q in inboxes]
+    for p in procs:
+        p.start()
+
+    number = 0
+    for lines in batches:
+        shards = [([], []) for _ in range(workers)]
+        for line in lines:
+            number += 1
+            shard = shards[zlib.crc32(game_id_of(line, fmt).encode("utf-8")) % workers]
+            shard[0].append(number)
+            shard[1].append(line)
+        for q, shard in zip(inboxes, shards):
+            if shard[1]:
+                q.put(shard)
+        while not outbox.empty():  # ir escribiendo lo que ya está listo
+            lines, _, _ = outbox.get()
+            if lines:
+                write("\n".join(lines) + "\n")
+
+    for q in inboxes:
+        q.put(None)
+    hands = errors = 0
+    finished = 0
+    while finished < workers:
+        lines, h, e = outbox.get()
+        if lines is None:
+            finished += 1
+            hands += h
+            errors += e
+        elif lines:
+            write("\n".join(lines) + "\n")
+    for p in procs:
+        p.join()
+    return hands, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Juega manos leídas de stdin y emite eventos JSON.")
+    parser.add_argument("--format", choices=("auto",) + FORMATS, default="auto")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="procesos entre los que se reparten las partidas")
+    parser.add_argument("--only-final", action="store_true",
+                        help="emitir solo el fin de cada partida (y los errores)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    batches = read_lines(sys.stdin.buffer)
+    first = next(batches, [])
+    fmt = args.format
+    if fmt == "auto":
+        fmt = detect_format(next((line for line in first if line.strip()), ""))
+
+    def all_batches():
+        yield first
+        yield from batches
+
+    write = sys.stdout.write
+    if args.workers > 1:
+        hands, errors = run_sharded(all_batches(), fmt, args.workers, args.only_final, write)
+    else:
+        ingestor = Ingestor(fmt, args.only_final)
+        line = 1
+        for lines in all_batches():
+            for i in range(0, len(lines), BATCH_LINES):
+                out = ingestor.feed(lines[i:i + BATCH_LINES], line + i)
+                if out:
+                    write("\n".join(out) + "\n")
+            line += len(lines)
+        hands, errors = ingestor.hands, ingestor.errors
+    elapsed = time.perf_counter() - start
+    print(f"{hands} manos en {elapsed:.2f}s ({hands / max(elapsed, 1e-9) * 60:,.0f} manos/min), "
+          f"{errors} errores.", file=sys.stderr)
+    if errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+layout.py - Lienzo con scroll de la ventana principal
+
+Los eventos <Configure> llegan de a decenas mientras se arrastra o se
+maximiza la ventana. ScrollLayout los junta y aplica como mucho un ajuste
+por cuadro (FRAME_MS), recuerda los tamaños ya medidos para no tocar el
+canvas si nada cambió, y registra cuánto tarda cada ajuste para poder
+compararlo con FRAME_BUDGET_MS.
+"""
+
+import time
+import tkinter as tk
+
+FRAME_MS = 16             # intervalo mínimo entre ajustes (~60 cuadros por segundo)
+FRAME_BUDGET_MS = 16.7    # objetivo: cada ajuste de layout debe entrar en un cuadro
+
+
+class ScrollLayout:
+    """Mantiene el frame de contenido ajustado al ancho del canvas y su área de scroll."""
+
+    def __init__(self, canvas: tk.Canvas, window_id: int, frame: tk.Widget):
+        self.canvas = canvas
+        self.window_id = window_id
+        self.frame = frame
+
+        self._job: str | None = None
+        self._last_apply = 0.0
+        self._canvas_size: tuple[int, int] | None = None  # último tamaño recibido
+        self._frame_req_h: int | None = None             # None → volver a medir
+        self._applied: tuple[int, int] | None = None      # (ancho, alto) ya aplicados
+
+        # Métricas de tiempo por cuadro
+        self.frames = 0
+        self.frames_over_budget = 0
+        self.last_frame_ms = 0.0
+        self.worst_frame_ms = 0.0
+
+        canvas.bind("<Configure>", self._on_canvas_configure)
+        frame.bind("<Configure>", self._on_frame_configure)
+        # La rueda se escucha solo en la ventana que contiene al canvas: los
+        # widgets de otros Toplevel (diálogos) no llevan esa etiqueta de binding.
+        toplevel = canvas.winfo_toplevel()
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            toplevel.bind(seq, self._on_mousewheel, add="+")
+
+    # ── Eventos ───────────────────────────────────────────────────────────────
+
+    def _on_canvas_configure(self, event):
+        self._canvas_size = (event.width, event.height)
+        self._schedule()
+
+    def _on_frame_configure(self, _event=None):
+        self.invalidate()
+
+    def invalidate(self):
+        """Marca el contenido como cambiado para volver a medir su alto."""
+        self._frame_req_h = None
+        self._schedule()
+
+    def _on_mousewheel(self, event):
+        # En Windows la rueda le llega al widget con foco: lo que importa es el
+        # que está debajo del puntero
+        try:
+            widget = self.canvas.winfo_containing(event.x_root, event.y_root)
+        except KeyError:
+            return  # widget interno de Tk (p. ej. el desplegable de un Combobox)
+        if widget is None:
+            return
+        # Los widgets con scroll propio (historial, listas), o los que están
+        # dentro de uno, manejan su rueda
+        while widget is not None and widget is not self.canvas:
+            if self._scrolls_itself(widget):
+                return
+            widget = widget.master
+        if event.num == 4:
+            self.canvas.yview_scroll(-1, "units")
+        elif event.num == 5:
+            self.canvas.yview_scroll(1, "units")
+        elif event.delta:
+            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+
+    @staticmethod
+    def _scrolls_itself(widget: tk.Misc) -> bool:
+        """¿Tiene una barra de scroll vertical conectada? Tener yview no alcanza: todo Canvas lo tiene."""
+        try:
+            return bool(str(widget.cget("yscrollcommand")))
+        except tk.TclError:
+            return False  # el widget no tiene esa opción
+
+    # ── Ajuste por cuadro ─────────────────────────────────────────────────────
+
+    def _schedule(self):
+        if self._job is not None:
+            return
+        elapsed_ms = (time.perf_counter() - self._last_apply) * 1000
+        self._job = self.canvas.after(max(0, int(FRAME_MS - elapsed_ms)), self._apply)
+
+    def _apply(self):
+        self._job = None
+        start = time.perf_counter()
+
+        if self._canvas_size is None:
+            self._canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
+        canvas_w, canvas_h = self._canvas_size
+        if self._frame_req_h is None:
+            self._frame_req_h = self.frame.winfo_reqheight()
+        size = (canvas_w, max(self._frame_req_h, canvas_h))
+
+        if size != self._applied:
+            self.canvas.itemconfig(self.window_id, width=size[0], height=size[1])
+            self.canvas.configure(scrollregion=(0, 0, *size))
+            self._applied = size
+
+        end = time.perf_counter()
+        self._last_apply = end
+        self._record((end - start) * 1000)
+
+    def _record(self, ms: float):
+        self.frames += 1
+        self.last_frame_ms = ms
+        self.worst_frame_ms = max(self.worst_frame_ms, ms)
+        if ms > FRAME_BUDGET_MS:
+            self.frames_over_budget += 1
+
+    def describe(self) -> str:
+        s = self.stats()
+        return (f"Ajustes de la ventana: {s['frames']} cuadros, {s['over_budget']} por encima de "
+                f"{s['budget_ms']} ms (peor {s['worst_ms']} ms, último {s['last_ms']} ms).")
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "over_budget": self.frames_over_budget,
+            "last_ms": round(self.last_frame_ms, 2),
+            "worst_ms": round(self.worst_frame_ms, 2),
+            "budget_ms": FRAME_BUDGET_MS,
+        }
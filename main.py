@@ -2,8 +2,12 @@
 main.py - Punto de entrada de la aplicación Buraco Score Tracker
 """
 
+import multiprocessing
+
 from ui import BuracoApp
 
 if __name__ == "__main__":
+    # Necesario para el proceso de la pantalla de espectadores en el .exe de Windows
+    multiprocessing.freeze_support()
     app = BuracoApp()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+pairing.py - Armado de mesas por sistema suizo para torneos
+
+Con los resultados de las partidas terminadas se arma la tabla de posiciones
+(partidas ganadas y, para desempatar, puntos a favor) y se forman las mesas
+de la ronda siguiente: cada mesa junta participantes de posiciones vecinas y
+se evita repetir rivales. Si la cantidad de participantes no divide justo,
+las mesas del fondo de la tabla se arman de 2 o 3 lugares según haga falta.
+
+Uso:
+    python pairing.py carpeta_con_partidas --seats 2
+"""
+
+import argparse
+import time
+from dataclasses import dataclass
+from itertools import combinations
+from typing import Iterable, Optional
+
+from game import Game
+from ratings import GameResult, load_archive
+
+
+@dataclass
+class Standing:
+    name: str
+    wins: int = 0
+    points: int = 0
+    played: int = 0
+
+    @property
+    def sort_key(self) -> tuple:
+        return (-self.wins, -self.points, self.name)
+
+
+def _as_result(item) -> GameResult:
+    return item if isinstance(item, GameResult) else GameResult.from_game(item)
+
+
+def standings(results: Iterable, entrants: Optional[Iterable[str]] = None
+              ) -> tuple[list[Standing], dict[str, set[str]]]:
+    """Tabla de posiciones ordenada y, por participante, con quiénes ya jugó."""
+    table: dict[str, Standing] = {n: Standing(n) for n in entrants or ()}
+    met: dict[str, set[str]] = {n: set() for n in table}
+    for item in results:
+        result = _as_result(item)
+        for name, total in zip(result.names, result.totals):
+            row = table.setdefault(name, Standing(name))
+            row.played += 1
+            row.points += total
+            row.wins += name == result.winner
+            met.setdefault(name, set()).update(n for n in result.names if n != name)
+    rows = sorted(table.values(), key=lambda r: r.sort_key)
+    return rows, met
+
+
+def table_sizes(n: int, seats: int) -> list[int]:
+    """Tamaños de mesa para n participantes: mesas de `seats` y el ajuste al final."""
+    if seats not in (2, 3):
+        raise ValueError("Las mesas son de 2 o 3 lugares.")
+    if n < 2:
+        raise ValueError("Se necesitan al menos 2 participantes.")
+    if seats == 2:
+        return [2] * (n // 2 - 1) + [3] if n % 2 else [2] * (n // 2)
+    rest = n % 3
+    if rest == 0:
+        return [3] * (n // 3)
+    if rest == 2:
+        return [3] * (n // 3) + [2]
+    return [3] * (n // 3 - 1) + [2, 2]  # n % 3 == 1
+
+
+def _rematches(table: list[int], met: list[set[int]]) -> int:
+    return sum(1 for a, b in combinations(table, 2) if b in met[a])
+
+
+def pair_next_round(results: Iterable, seats: int = 2,
+                    entrants: Optional[Iterable[str]] = None) -> list[Game]:
+    """
+    Arma las mesas de la próxima ronda como partidas listas para jugar.
+    results: partidas terminadas (Game o GameResult); entrants: participantes
+    que todavía no jugaron, si los hay.
+    """
+    rows, met_by_name = standings(results, entrants)
+    names = [r.name for r in rows]
+    pos = {n: i for i, n in enumerate(names)}
+    # Trabajar con posiciones en lugar de nombres: sets de enteros son más rápidos
+    met = [{pos[o] for o in met_by_name.get(n, ()) if o in pos} for n in names]
+
+    tables = _greedy_tables(table_sizes(len(names), seats), met)
+    _repair(tables, met)
+    return [Game([names[i] for i in table]) for table in tables]
+
+
+def _greedy_tables(sizes: list[int], met: list[set[int]]) -> list[list[int]]:
+    """De arriba hacia abajo: cada mesa toma al primero libre y a los más cercanos sin revancha."""
+    free = list(range(len(met)))  # en orden de posición
+    tables = []
+    for size in sizes:
+        table = [free.pop(0)]
+        for _ in range(size - 1):
+            pick = next((k for k, p in enumerate(free)
+                         if not any(p in met[q] for q in table)), 0)
+            table.append(free.pop(pick))
+        tables.append(table)
+    return tables
+
+
+def _repair(tables: list[list[int]], met: list[set[int]], window: int = 8):
+    """
+    Intercambia participantes con mesas cercanas (hasta `window` mesas de
+    distancia) cuando eso reduce las revanchas, para no desordenar la tabla
+    más de lo necesario.
+    """
+    for t, table in enumerate(tables):
+        for u in _nearby(t, len(tables), window):
+            if not _rematches(table, met):
+                break
+            _swap_if_better(table, tables[u], met)
+
+
+def _nearby(t: int, count: int, window: int):
+    for dist in range(1, window + 1):
+        for u in (t + dist, t - dist):
+            if 0 <= u < count:
+                yield u
+
+
+def _swap_if_better(a: list[int], b: list[int], met: list[set[int]]) -> bool:
+    before = _rematches(a, met) + _rematches(b, met)
+    for i in range(len(a)):
+        for j in range(len(b)):
+            a[i], b[j] = b[j], a[i]
+            if _rematches(a, met) + _rematches(b, met) < before:
+                return True
+            a[i], b[j] = b[j], a[i]
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arma las mesas de la próxima ronda.")
+    parser.add_argument("folder", help="carpeta con las partidas terminadas (.json / .bjl)")
+    parser.add_argument("--seats", type=int, choices=(2, 3), default=2)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = load_archive(args.folder)
+    tables = pair_next_round(results, args.seats)
+    elapsed = time.perf_counter() - start
+    for i, game in enumerate(tables, start=1):
+        print(f"Mesa {i:3}: " + " vs ".join(t.name for t in game.teams))
+    print(f"\n{len(tables)} mesas en {elapsed:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+ratings.py - Ranking Elo de equipos/jugadores a partir de partidas terminadas
+
+Cada partida terminada se reparte en enfrentamientos de a pares según la
+posición final (el ganador primero, el resto por puntaje), así que una
+partida de 3 jugadores cuenta como tres duelos. El ajuste de cada duelo se
+escala según la diferencia de puntos entre ambos.
+
+Las actualizaciones son incrementales: record() aplica una partida y guarda
+los deltas para que undo() la pueda revertir. Si la partida deshecha no es
+la última, o si se quiere reconstruir todo desde un archivo de partidas, se
+recalcula la historia completa en una sola pasada (recompute).
+"""
+
+import json
+import math
+import os
+from dataclasses import dataclass, asdict
+from typing import Iterable, Optional
+
+from game import Game, JournalReader, iter_archive
+from storage import atomic_write
+
+DEFAULT_RATING = 1500.0
+K_FACTOR = 32.0
+MARGIN_SCALE = 500  # cada MARGIN_SCALE puntos de diferencia suman ~log(2) al multiplicador
+RATINGS_FILE = os.path.join(os.path.expanduser("~"), ".buraco_ratings.json")
+
+
+@dataclass
+class GameResult:
+    """Resultado final de una partida, en orden de equipos."""
+    game_id: str
+    names: list[str]
+    totals: list[int]
+    winner: str
+
+    @classmethod
+    def from_game(cls, game: Game) -> "GameResult":
+        """El id es el de la partida: reabrirla y volver a terminarla no la cuenta dos veces."""
+        if not game.is_over:
+            raise ValueError("La partida todavía no terminó.")
+        return cls(
+            game_id=game.game_id,
+            names=[t.name for t in game.teams],
+            totals=[t.total for t in game.teams],
+            winner=game.winner.name,
+        )
+
+    def standings(self) -> list[tuple[str, int]]:
+        """(nombre, total) del primero al último: el ganador siempre primero."""
+        rows = list(zip(self.names, self.totals))
+        return sorted(rows, key=lambda r: (r[0] != self.winner, -r[1]))
+
+
+def _margin_multiplier(margin: int) -> float:
+    return 1.0 + math.log1p(abs(margin) / MARGIN_SCALE)
+
+
+def _expected(rating_a: float, rating_b: float) -> float:
+    return 1.0 / (1.0 + 10 ** ((rating_b - rating_a) / 400))
+
+
+class RatingEngine:
+    def __init__(self):
+        self.ratings: dict[str, float] = {}
+        self.games_played: dict[str, int] = {}
+        self.results: list[GameResult] = []
+        self._deltas: dict[str, dict[str, float]] = {}
+
+    # ── Actualización incremental ─────────────────────────────────────────────
+
+    def is_recorded(self, game_id: str) -> bool:
+        return game_id in self._deltas
+
+    def record(self, result: GameResult) -> dict[str, float]:
+        """Aplica una partida terminada y devuelve el cambio de rating de cada participante."""
+        if result.game_id in self._deltas:
+            raise ValueError(f"La partida {result.game_id} ya fue registrada.")
+        deltas = self._apply(result)
+        self.results.append(result)
+        self._deltas[result.game_id] = deltas
+        return deltas
+
+    def undo(self, game_id: str):
+        """Revierte una partida registrada (p. ej. si se deshizo la mano ganadora)."""
+        if game_id not in self._deltas:
+            return
+        if self.results[-1].game_id == game_id:
+            self.results.pop()
+            for name, delta in self._deltas.pop(game_id).items():
+                self.ratings[name] -= delta
+                self.games_played[name] -= 1
+            return
+        # No es la última: los ratings posteriores dependen de ella
+        self.recompute([r for r in self.results if r.game_id != game_id])
+
+    def recompute(self, results: Optional[Iterable[GameResult]] = None):
+        """Recalcula todos los ratings desde cero, en el orden dado."""
+        results = list(self.results if results is None else results)
+        self.ratings, self.games_played = {}, {}
+        self.results, self._deltas = [], {}
+        for result in results:
+            self.record(result)
+
+    def _apply(self, result: GameResult) -> dict[str, float]:
+        standings = result.standings()
+        for name, _total in standings:
+            self.ratings.setdefault(name, DEFAULT_RATING)
+            self.games_played.setdefault(name, 0)
+
+        # Todos los duelos se calculan con los ratings previos a la partida
+        before = {name: self.ratings[name] for name, _total in standings}
+        deltas = {name: 0.0 for name, _total in standings}
+        k = K_FACTOR / max(1, len(standings) - 1)
+        for i, (upper, upper_total) in enumerate(standings):
+            for lower, lower_total in standings[i + 1:]:
+                change = k * _margin_multiplier(upper_total - lower_total) * (
+                    1.0 - _expected(before[upper], before[lower]))
+                deltas[upper] += change
+                deltas[lower] -= change
+
+        for name, delta in deltas.items():
+            self.ratings[name] += delta
+            self.games_played[name] += 1
+        return deltas
+
+    # ── Consultas ─────────────────────────────────────────────────────────────
+
+    def ranking(self) -> list[tuple[str, float, int]]:
+        """(nombre, rating, partidas) ordenado de mayor a menor rating."""
+        rows = [(n, r, self.games_played[n]) for n, r in self.ratings.items()]
+        return sorted(rows, key=lambda row: (-row[1], row[0]))
+
+    # ── Persistencia ──────────────────────────────────────────────────────────
+
+    def to_dict(self) -> dict:
+        return {
+            "ratings": self.ratings,
+            "games_played": self.games_played,
+            "results": [asdict(r) for r in self.results],
+            "deltas": self._deltas,
+        }
+
+    def save(self, filepath: str = RATINGS_FILE):
+        atomic_write(filepath, lambda f: json.dump(self.to_dict(), f, ensure_ascii=False, indent=2))
+
+    @classmethod
+    def load(cls, filepath: str = RATINGS_FILE) -> "RatingEngine":
+        engine = cls()
+        if not os.path.exists(filepath):
+            return engine
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        engine.ratings = data["ratings"]
+        engine.games_played = data["games_played"]
+        engine.results = [GameResult(**r) for r in data["results"]]
+        engine._deltas = data["deltas"]
+        return engine
+
+
+def load_archive(folder: str) -> list[GameResult]:
+    """
+    Lee las partidas terminadas de una carpeta (.json y .bjl), de la más vieja
+    a la más nueva. Los archivos guardados antes de que las partidas tuvieran
+    id usan el nombre del archivo. Si la misma partida está guardada más de
+    una vez, vale la copia más nueva.
+    """
+    results: dict[str, GameResult] = {}
+    for _path, result in iter_archive(folder, _load_result, by_mtime=True):
+        if result is not None:
+            results.pop(result.game_id, None)
+            results[result.game_id] = result
+    return list(results.values())
+
+
+def _load_result(path: str) -> Optional[GameResult]:
+    """Resultado guardado en el archivo, sin leer las manos: alcanza con totales y ganador."""
+    if JournalReader.is_journal(path):
+        with JournalReader(path) as reader:
+            header = reader.header
+        teams = header["teams"]
+        totals = [t["total"] for t in teams]
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            header = json.load(f)
+        teams = header["teams"]
+        totals = [sum(t["scores"]) for t in teams]
+    if header.get("winner") is None:
+        return None
+    return GameResult(
+        game_id=header.get("game_id", os.path.basename(path)),
+        names=[t["name"] for t in teams],
+        totals=totals,
+        winner=header["winner"],
+    )
@@ -4,27 +4,87 @@ round_dialog.py - Diálogo para ingresar los puntajes de una mano
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-from game import RoundScore, BONUS
+from game import RoundScore, BONUS, TARGET_SCORE
 from calculator import CardCalculatorDialog
+from solver import best_plan
 
 
 class RoundDialog(tk.Toplevel):
+    """
+    Formulario de una mano. Se construye una vez por partida y se reutiliza
+    con ask(): al cerrarse se oculta y la próxima vez se vuelve a mostrar limpio.
+    """
+
+    # Valores iniciales de cada campo del formulario
+    DEFAULTS = {
+        "cards_down": "0",
+        "cards_remaining": "0",
+        "canastas_puras": "0",
+        "canastas_impuras": "0",
+        "cierre": False,
+        "muerto_bought": False,
+    }
+
     def __init__(self, parent, round_num: int, team_names: list[str]):
         super().__init__(parent)
-        self.title(f"Mano #{round_num}")
+        self.withdraw()
         self.resizable(False, False)
-        self.grab_set()
         self.result: tuple = tuple([None] * len(team_names))
         self.team_names = team_names
         self.round_num = round_num
 
         self._fields: list[dict] = [{} for _ in team_names]
+        # No tiene campo en el formulario: se conserva el de la mano que se corrige
+        self._muerto_available: list[bool] = [True] * len(team_names)
+        self._suspend_traces = False
+        self._done = tk.BooleanVar(value=False)
+        self._calc: CardCalculatorDialog | None = None
+        self._totals: list[int] | None = None  # totales antes de la mano, para la sugerencia
         self._build_ui()
         self.protocol("WM_DELETE_WINDOW", self._on_cancel)
 
+    def ask(self, round_num: int, initial: list[RoundScore] | None = None,
+            totals: list[int] | None = None) -> tuple:
+        """
+        Muestra el formulario para la mano round_num (modal) y devuelve result.
+        Con `initial` se abre cargado con esos puntajes, para corregir una mano.
+        Con `totals` (puntaje de cada equipo antes de la mano) se sugiere qué
+        falta para llegar a TARGET_SCORE.
+        """
+        self.round_num = round_num
+        self._totals = totals
+        self.title(f"Mano #{round_num}" + (" (corrección)" if initial else ""))
+        self.reset(initial)
+        self.result = tuple([None] * len(self.team_names))
+        self._done.set(False)
+        self._notebook.select(0)
+        self.deiconify()
+        self.lift()
+        self.grab_set()
+        self.wait_variable(self._done)
+        return self.result
+
+    def reset(self, initial: list[RoundScore] | None = None):
+        """Carga todos los campos en un solo lote: valores iniciales o los de `initial`."""
+        self._muerto_available = ([s.muerto_available for s in initial] if initial is not None
+                                  else [True] * len(self.team_names))
+        self._suspend_traces = True
+        try:
+            for idx, f in enumerate(self._fields):
+                for key, value in self.DEFAULTS.items():
+                    if initial is not None:
+                        value = getattr(initial[idx], key)
+                        value = value if isinstance(value, bool) else str(value)
+                    f[key].set(value)
+        finally:
+            self._suspend_traces = False
+        for idx in range(len(self.team_names)):
+            self._update_preview(idx)
+
     def _build_ui(self):
         notebook = ttk.Notebook(self)
         notebook.pack(fill="both", expand=True, padx=12, pady=8)
+        self._notebook = notebook
 
         for i, name in enumerate(self.team_names):
             tab = ttk.Frame(notebook, padding=12)
@@ -121,6 +181,11 @@ class RoundDialog(tk.Toplevel):
         f["preview_var"] = tk.StringVar(value="Subtotal estimado: —")
         ttk.Label(parent, textvariable=f["preview_var"],
                   font=("Segoe UI", 10, "bold")).grid(row=row, column=0, sticky="w")
+        row += 1
+
+        f["hint_var"] = tk.StringVar(value="")
+        ttk.Label(parent, textvariable=f["hint_var"], foreground="gray",
+                  wraplength=360, justify="left").grid(row=row, column=0, sticky="w", pady=(4, 0))
 
         for key in ("cards_down", "cards_remaining", "canastas_puras", "canastas_impuras"):
             f[key].trace_add("write", lambda *_, i=idx: self._update_preview(i))
@@ -130,10 +195,13 @@ class RoundDialog(tk.Toplevel):
     # ── Helpers ───────────────────────────────────────────────────────────────
 
     def _open_calc(self, target_var: tk.StringVar):
-        dlg = CardCalculatorDialog(self)
-        self.wait_window(dlg)
-        if dlg.result is not None:
-            target_var.set(str(dlg.result))
+        if self._calc is None:
+            self._calc = CardCalculatorDialog(self)
+        result = self._calc.ask()
+        # La calculadora liberó el grab al cerrarse: este diálogo vuelve a ser modal
+        self.grab_set()
+        if result is not None:
+            target_var.set(str(result))
 
     def _has_data(self, idx: int) -> bool:
         f = self._fields[idx]
@@ -150,6 +218,9 @@ class RoundDialog(tk.Toplevel):
             return False
 
     def _update_preview(self, idx: int):
+        if self._suspend_traces:
+            return
+        self._update_hint(idx)
         if not self._has_data(idx):
             self._fields[idx]["preview_var"].set("Subtotal estimado: —")
             return
@@ -159,6 +230,28 @@ class RoundDialog(tk.Toplevel):
         except Exception:
             self._fields[idx]["preview_var"].set("Subtotal estimado: —")
 
+    def _update_hint(self, idx: int):
+        """Sugerencia de lo que falta en esta mano para llegar a TARGET_SCORE."""
+        hint = self._fields[idx]["hint_var"]
+        if self._totals is None:
+            hint.set("")
+            return
+        try:
+            rs = self._build_round_score(idx)
+        except ValueError:
+            hint.set("")
+            return
+        deficit = TARGET_SCORE - (self._totals[idx] + rs.total)
+        if deficit <= 0:
+            hint.set(f"¡Con esta mano llega a {TARGET_SCORE}!")
+            return
+        plan = best_plan(deficit, cierre=rs.cierre, muerto_bought=rs.muerto_bought,
+                         canastas=rs.canastas_puras + rs.canastas_impuras)
+        if plan is None:
+            hint.set(f"Faltan {deficit} pts para {TARGET_SCORE} (no alcanza en esta mano).")
+        else:
+            hint.set(f"Faltan {deficit} pts para {TARGET_SCORE}. Por ejemplo: {plan.describe()}.")
+
     def _build_round_score(self, idx: int) -> RoundScore:
         f = self._fields[idx]
         return RoundScore(
@@ -169,7 +262,7 @@ class RoundDialog(tk.Toplevel):
             canastas_puras=max(0, int(f["canastas_puras"].get()   or 0)),
             canastas_impuras=max(0, int(f["canastas_impuras"].get() or 0)),
             muerto_bought=f["muerto_bought"].get(),
-            muerto_available=True,
+            muerto_available=self._muerto_available[idx],
         )
 
     def _on_confirm(self):
@@ -179,8 +272,13 @@ class RoundDialog(tk.Toplevel):
             messagebox.showerror("Error", f"Valor inválido: {e}", parent=self)
             return
         self.result = tuple(scores)
-        self.destroy()
+        self._close()
 
     def _on_cancel(self):
         self.result = tuple([None] * len(self.team_names))
-        self.destroy()
\ No newline at end of file
+        self._close()
+
+    def _close(self):
+        self.grab_release()
+        self.withdraw()
+        self._done.set(True)
\ No newline at end of file
@@ -0,0 +1,206 @@
+"""
+score_index.py - Índice de sumas acumuladas de los puntajes por mano
+
+PrefixTree es un árbol de segmentos que guarda, por nodo, la suma de su
+tramo y la mayor suma de un prefijo del tramo. Con eso se puede cambiar una
+mano, pedir el acumulado después de la mano k o encontrar la primera mano en
+la que un equipo llegó a un puntaje, todo en O(log n).
+
+ScoreIndex tiene un árbol por equipo y además lleva la mayor ventaja y la
+racha más larga de manos ganadas. Esas dos se actualizan en O(1) al agregar
+una mano; si se corrige o se borra una del medio se recalculan una sola vez,
+en la próxima consulta.
+"""
+
+from typing import Iterable, Optional
+
+_NEG_INF = float("-inf")
+
+
+class PrefixTree:
+    def __init__(self, values: Iterable[int] = ()):
+        self._build(list(values))
+
+    def _build(self, values: list[int], capacity: int = 1):
+        self._n = len(values)
+        cap = max(capacity, 1)
+        while cap < self._n:
+            cap *= 2
+        self._cap = cap
+        self._sum = [0] * (2 * cap)
+        self._best = [_NEG_INF] * (2 * cap)  # mayor suma de un prefijo no vacío
+        for i, v in enumerate(values):
+            self._sum[cap + i] = v
+            self._best[cap + i] = v
+        for node in range(cap - 1, 0, -1):
+            self._pull(node)
+
+    def _pull(self, node: int):
+        left, right = 2 * node, 2 * node + 1
+        self._sum[node] = self._sum[left] + self._sum[right]
+        self._best[node] = max(self._best[left], self._sum[left] + self._best[right])
+
+    def __len__(self) -> int:
+        return self._n
+
+    def values(self) -> list[int]:
+        return self._sum[self._cap:self._cap + self._n]
+
+    @property
+    def total(self) -> int:
+        return self._sum[1]
+
+    def append(self, value: int):
+        if self._n == self._cap:
+            self._build(self.values(), self._cap * 2)
+        self._n += 1
+        self.set(self._n - 1, value)
+
+    def pop(self) -> int:
+        value = self._sum[self._cap + self._n - 1]
+        self._set_leaf(self._n - 1, 0, _NEG_INF)
+        self._n -= 1
+        return value
+
+    def set(self, i: int, value: int):
+        if not 0 <= i < self._n:
+            raise IndexError("índice de mano fuera de rango")
+        self._set_leaf(i, value, value)
+
+    def _set_leaf(self, i: int, value: int, best: float):
+        node = self._cap + i
+        self._sum[node] = value
+        self._best[node] = best
+        node //= 2
+        while node:
+            self._pull(node)
+            node //= 2
+
+    def prefix(self, k: int) -> int:
+        """Suma de los primeros k valores."""
+        k = max(0, min(k, self._n))
+        total = 0
+        lo, hi = self._cap, self._cap + k
+        while lo < hi:
+            if lo & 1:
+                total += self._sum[lo]
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                total += self._sum[hi]
+            lo //= 2
+            hi //= 2
+        return total
+
+    def first_reaching(self, target: int) -> Optional[int]:
+        """Menor k tal que prefix(k) >= target (k >= 1), o None si nunca se llega."""
+        if self._n == 0 or self._best[1] < target:
+            return None
+        node, acc = 1, 0
+        while node < self._cap:
+            left = 2 * node
+            if acc + self._best[left] >= target:
+                node = left
+            else:
+                acc += self._sum[left]
+                node = left + 1
+        return node - self._cap + 1
+
+
+class ScoreIndex:
+    """Acumulados por equipo sobre los puntajes de cada mano."""
+
+    def __init__(self, columns: list[list[int]]):
+        self._trees = [PrefixTree(col) for col in columns]
+        self._stats_valid = False
+        self._recompute_stats()
+
+    @property
+    def num_teams(self) -> int:
+        return len(self._trees)
+
+    def __len__(self) -> int:
+        return len(self._trees[0])
+
+    # ── Cambios ───────────────────────────────────────────────────────────────
+
+    def append(self, hand: list[int]):
+        for tree, pts in zip(self._trees, hand):
+            tree.append(pts)
+        if self._stats_valid:
+            self._advance_stats(hand, len(self))
+
+    def pop(self):
+        for tree in self._trees:
+            tree.pop()
+        self._stats_valid = False
+
+    def set(self, i: int, hand: list[int]):
+        for tree, pts in zip(self._trees, hand):
+            tree.set(i, pts)
+        self._stats_valid = False
+
+    # ── Consultas ─────────────────────────────────────────────────────────────
+
+    def score_after(self, team_idx: int, k: int) -> int:
+        """Puntaje acumulado del equipo después de las primeras k manos."""
+        return self._trees[team_idx].prefix(k)
+
+    def first_crossing(self, target: int) -> Optional[tuple[int, list[int]]]:
+        """
+        Primera mano (contando desde 1) en la que algún equipo llegó a target,
+        junto con los índices de todos los equipos que llegaron en esa mano.
+        """
+        hits = [t.first_reaching(target) for t in self._trees]
+        hands = [h for h in hits if h is not None]
+        if not hands:
+            return None
+        k = min(hands)
+        return k, [i for i, t in enumerate(self._trees) if t.prefix(k) >= target]
+
+    def max_lead(self) -> Optional[tuple[int, int, int]]:
+        """(equipo, ventaja, mano) de la mayor ventaja sobre el segundo, o None."""
+        self._ensure_stats()
+        return self._max_lead
+
+    def longest_streak(self) -> Optional[tuple[int, int]]:
+        """(equipo, manos) de la racha más larga de manos ganadas seguidas, o None."""
+        self._ensure_stats()
+        return self._longest
+
+    # ── Estadísticas incrementales ────────────────────────────────────────────
+
+    def _ensure_stats(self):
+        if not self._stats_valid:
+            self._recompute_stats()
+
+    def _recompute_stats(self):
+        self._acc = [0] * self.num_teams
+        self._max_lead: Optional[tuple[int, int, int]] = None
+        self._streak: tuple[Optional[int], int] = (None, 0)
+        self._longest: Optional[tuple[int, int]] = None
+        self._stats_valid = True
+        columns = [t.values() for t in self._trees]
+        for k, hand in enumerate(zip(*columns), start=1):
+            self._advance_stats(hand, k)
+
+    def _advance_stats(self, hand, k: int):
+        acc = self._acc
+        for i, pts in enumerate(hand):
+            acc[i] += pts
+        if len(acc) > 1:
+            order = sorted(range(len(acc)), key=lambda i: -acc[i])
+            lead = acc[order[0]] - acc[order[1]]
+            if lead > 0 and (self._max_lead is None or lead > self._max_lead[1]):
+                self._max_lead = (order[0], lead, k)
+
+            best = max(hand)
+            winners = [i for i, pts in enumerate(hand) if pts == best]
+            if len(winners) == 1:
+                team, length = self._streak
+                length = length + 1 if team == winners[0] else 1
+                self._streak = (winners[0], length)
+                if self._longest is None or length > self._longest[1]:
+                    self._longest = self._streak
+            else:
+                self._streak = (None, 0)  # mano empatada: corta las rachas
@@ -0,0 +1,122 @@
+"""
+solver.py - "¿Qué necesito para ganar?"
+
+Dado cuántos puntos le faltan a un equipo para llegar a TARGET_SCORE, busca
+las combinaciones de jugadas más simples que alcanzan esa diferencia en una
+mano: fichas bajadas, canastas puras/impuras, cierre y muerto. Se puede
+partir de lo que ya está cargado en el formulario (cierre, muerto, canastas)
+y entonces cada plan dice solo lo que falta agregar.
+
+Una combinación es más simple cuanto menos jugadas especiales pide (una
+canasta pura cuenta doble) y, a igual cantidad, cuantas menos fichas hacen
+falta. Los resultados se memorizan por diferencia, reglas y estado de
+partida, así que actualizar la sugerencia mientras se tipea es inmediato.
+
+No hace falta programación dinámica sobre la diferencia: las jugadas
+especiales son a lo sumo 2 × 2 × 28 = 112 combinaciones y, fijadas esas,
+las fichas que faltan salen de una cuenta. Se recorren todas y la caché
+por diferencia hace el resto.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from game import rules_signature
+
+MAX_CARDS_DOWN = 400   # lo que razonablemente se baja en fichas en una mano
+MAX_CANASTAS = 6       # canastas nuevas que se consideran por mano
+CARD_STEP = 5          # todas las fichas valen múltiplos de 5
+
+
+@dataclass(frozen=True)
+class Plan:
+    """Lo que hay que sumar en la mano (además de lo ya cargado)."""
+    cards_down: int = 0
+    canastas_puras: int = 0
+    canastas_impuras: int = 0
+    cierre: bool = False
+    muerto_bought: bool = False
+    points: int = 0
+
+    @property
+    def effort(self) -> tuple[int, int]:
+        plays = 2 * self.canastas_puras + self.canastas_impuras + self.cierre + self.muerto_bought
+        return plays, self.cards_down
+
+    def describe(self) -> str:
+        parts = []
+        if self.cards_down:
+            parts.append(f"{self.cards_down} en fichas")
+        if self.canastas_puras:
+            parts.append(f"{self.canastas_puras} canasta{'s' if self.canastas_puras > 1 else ''} pura"
+                         f"{'s' if self.canastas_puras > 1 else ''}")
+        if self.canastas_impuras:
+            parts.append(f"{self.canastas_impuras} canasta{'s' if self.canastas_impuras > 1 else ''} impura"
+                         f"{'s' if self.canastas_impuras > 1 else ''}")
+        if self.muerto_bought:
+            parts.append("comprar el muerto")
+        if self.cierre:
+            parts.append("cierre")
+        return " + ".join(parts) if parts else "nada más"
+
+
+def _dominates(a: Plan, b: Plan) -> bool:
+    """a pide lo mismo o menos que b en todo."""
+    return (a.cards_down <= b.cards_down and a.canastas_puras <= b.canastas_puras
+            and a.canastas_impuras <= b.canastas_impuras
+            and a.cierre <= b.cierre and a.muerto_bought <= b.muerto_bought)
+
+
+@lru_cache(maxsize=4096)
+def _solve(deficit: int, rules: tuple, has_cierre: bool, has_muerto: bool,
+           has_canasta: bool, limit: int) -> tuple[Plan, ...]:
+    _target, bonus = rules
+    bonus = dict(bonus)
+    candidates = []
+    for muerto in ((False,) if has_muerto else (False, True)):
+        # Comprar el muerto pasa de restar a sumar el bonus
+        muerto_pts = 2 * bonus["muerto"] if muerto else 0
+        for cierre in ((False,) if has_cierre else (False, True)):
+            if cierre and not (has_muerto or muerto):
+                continue
+            for puras in range(MAX_CANASTAS + 1):
+                for impuras in range(MAX_CANASTAS + 1 - puras):
+                    if cierre and not (has_canasta or puras or impuras):
+                        continue
+                    pts = (muerto_pts + (bonus["cierre"] if cierre else 0)
+                           + puras * bonus["canasta_pura"]
+                           + impuras * bonus["canasta_impura"])
+                    missing = max(0, deficit - pts)
+                    cards = -(-missing // CARD_STEP) * CARD_STEP
+                    if cards > MAX_CARDS_DOWN:
+                        continue
+                    candidates.append(Plan(cards, puras, impuras, cierre, muerto, pts + cards))
+
+    candidates.sort(key=lambda p: p.effort)
+    plans: list[Plan] = []
+    for plan in candidates:
+        if any(_dominates(kept, plan) for kept in plans):
+            continue
+        plans.append(plan)
+        if len(plans) == limit:
+            break
+    return tuple(plans)
+
+
+def solve(deficit: int, *, cierre: bool = False, muerto_bought: bool = False,
+          canastas: int = 0, limit: int = 3) -> tuple[Plan, ...]:
+    """
+    Planes más simples para sumar al menos `deficit` puntos en la mano.
+    cierre / muerto_bought / canastas: lo que ya está cargado en la mano.
+    Devuelve () si no hace falta nada o si no hay forma razonable de llegar.
+    """
+    if deficit <= 0:
+        return ()
+    deficit = -(-deficit // CARD_STEP) * CARD_STEP  # redondeo: misma respuesta, más aciertos de caché
+    return _solve(deficit, rules_signature(), cierre, muerto_bought, canastas > 0, limit)
+
+
+def best_plan(deficit: int, **state) -> Optional[Plan]:
+    plans = solve(deficit, limit=1, **state)
+    return plans[0] if plans else None
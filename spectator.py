@@ -0,0 +1,227 @@
+"""
+spectator.py - Marcador para espectadores (TV) en un proceso aparte
+
+La app publica los totales, el avance y las últimas manos en un bloque de
+memoria compartida (multiprocessing.shared_memory) con un número de versión
+tipo seqlock: quien escribe lo pone impar mientras escribe y par al
+terminar. El proceso de la TV lee directamente del bloque, sin pasar
+mensajes, y solo vuelve a dibujar cuando la versión cambió.
+
+Para probarlo aparte:
+    python spectator.py <nombre_del_bloque>
+"""
+
+import struct
+import sys
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Optional
+
+from game import Game, TARGET_SCORE
+
+MAX_TEAMS = 3
+NAME_BYTES = 48
+LAST_HANDS = 10
+READ_ATTEMPTS = 100  # lecturas por consulta mientras la app escribe; después se espera a la próxima
+POLL_MS = 50
+
+# seq | equipos, manos en la lista, ganador (-1 = ninguno), empate | objetivo, mano actual
+_HEADER = struct.Struct("<Q B B b ? i I")
+_NAME = struct.Struct(f"<{NAME_BYTES}s")
+_TOTAL = struct.Struct("<i")
+_HAND = struct.Struct(f"<I {MAX_TEAMS}i")   # número de mano y subtotal por equipo
+
+_NAMES_AT = _HEADER.size
+_TOTALS_AT = _NAMES_AT + MAX_TEAMS * _NAME.size
+_HANDS_AT = _TOTALS_AT + MAX_TEAMS * _TOTAL.size
+BLOCK_SIZE = _HANDS_AT + LAST_HANDS * _HAND.size
+
+
+def _encode_name(name: str) -> bytes:
+    data = name.encode("utf-8")[:NAME_BYTES]
+    return data.decode("utf-8", "ignore").encode("utf-8")  # no cortar un carácter a la mitad
+
+
+class ScoreboardPublisher:
+    """Lado de la app: escribe el marcador en el bloque compartido."""
+
+    def __init__(self):
+        self._shm = shared_memory.SharedMemory(create=True, size=BLOCK_SIZE)
+        self._seq = 0
+        _HEADER.pack_into(self._shm.buf, 0, 0, 0, 0, -1, False, TARGET_SCORE, 0)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def publish(self, game: Optional[Game]):
+        buf = self._shm.buf
+        self._seq += 1  # impar: escritura en curso
+        struct.pack_into("<Q", buf, 0, self._seq)
+
+        teams = game.teams[:MAX_TEAMS] if game else []
+        rounds = []
+        if game:
+            # Las últimas manos, sin recorrer todo el historial
+            for i in range(max(0, len(game.rounds) - LAST_HANDS), len(game.rounds)):
+                rounds.append(game.rounds[i])
+        winner = game.teams.index(game.winner) if game and game.winner else -1
+        for i in range(MAX_TEAMS):
+            name = _encode_name(teams[i].name) if i < len(teams) else b""
+            _NAME.pack_into(buf, _NAMES_AT + i * _NAME.size, name)
+            _TOTAL.pack_into(buf, _TOTALS_AT + i * _TOTAL.size, teams[i].total if i < len(teams) else 0)
+        for i, rnd in enumerate(rounds):
+            subtotals = [s.total for s in rnd.scores] + [0] * (MAX_TEAMS - len(rnd.scores))
+            _HAND.pack_into(buf, _HANDS_AT + i * _HAND.size, rnd.number, *subtotals)
+
+        # El resto del encabezado se escribe todavía con la versión impar
+        _HEADER.pack_into(buf, 0, self._seq, len(teams), len(rounds), winner,
+                          bool(game and game.was_tied_win), TARGET_SCORE,
+                          game.current_round if game else 0)
+        self._seq += 1  # par: datos consistentes (lo último que se escribe)
+        struct.pack_into("<Q", buf, 0, self._seq)
+
+    def close(self):
+        self._shm.close()
+        self._shm.unlink()
+
+
+class ScoreboardReader:
+    """Lado de la TV: lee el bloque compartido sin bloquear a la app."""
+
+    def __init__(self, name: str, standalone: bool = False):
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+        except TypeError:
+            self._shm = shared_memory.SharedMemory(name=name)
+            if standalone:
+                # Un proceso independiente tiene su propio resource_tracker, que
+                # borraría el bloque de la app al salir: el dueño es la app.
+                from multiprocessing import resource_tracker
+                resource_tracker.unregister(self._shm._name, "shared_memory")
+        self.version = -1
+
+    def read(self) -> Optional[dict]:
+        """Devuelve el marcador si cambió desde la última lectura, o None."""
+        buf = self._shm.buf
+        for _ in range(READ_ATTEMPTS):
+            header = _HEADER.unpack_from(buf, 0)
+            seq = header[0]
+            if seq == self.version:
+                return None
+            if seq & 1:
+                time.sleep(0)  # la app está escribiendo
+                continue
+            _seq, n_teams, n_hands, winner, tied, target, current_round = header
+            names = [_NAME.unpack_from(buf, _NAMES_AT + i * _NAME.size)[0]
+                     .rstrip(b"\0").decode("utf-8", "ignore") for i in range(n_teams)]
+            totals = [_TOTAL.unpack_from(buf, _TOTALS_AT + i * _TOTAL.size)[0]
+                      for i in range(n_teams)]
+            hands = [_HAND.unpack_from(buf, _HANDS_AT + i * _HAND.size)
+                     for i in range(n_hands)]
+            if struct.unpack_from("<Q", buf, 0)[0] != seq:
+                continue  # se escribió mientras leíamos: otra vez
+            self.version = seq
+            return {
+                "names": names, "totals": totals, "winner": winner, "tied": tied,
+                "target": target, "current_round": current_round,
+                "hands": [(h[0], list(h[1:1 + n_teams])) for h in hands],
+            }
+        return None  # la app sigue escribiendo: se lee en la próxima consulta
+
+    def close(self):
+        self._shm.close()
+
+
+# ── Proceso de la TV ───────────────────────────────────────────────────────────
+
+def run_display(block_name: str, standalone: bool = False):
+    """Ventana a pantalla completa con el marcador; corre en su propio proceso."""
+    import tkinter as tk
+    from tkinter import ttk
+
+    reader = ScoreboardReader(block_name, standalone)
+    root = tk.Tk()
+    root.title("🃏 Buraco - Marcador")
+    root.configure(background="#101820")
+    root.attributes("-fullscreen", True)
+    root.bind("<Escape>", lambda _: root.attributes("-fullscreen", False))
+
+    style = ttk.Style(root)
+    style.theme_use("clam")
+    style.configure("TV.TFrame", background="#101820")
+    style.configure("TVName.TLabel",  background="#101820", foreground="white",
+                    font=("Segoe UI", 40, "bold"))
+    style.configure("TVScore.TLabel", background="#101820", foreground="#ffd54f",
+                    font=("Segoe UI", 110, "bold"))
+    style.configure("TVSub.TLabel",   background="#101820", foreground="#b0bec5",
+                    font=("Segoe UI", 22))
+    style.configure("TV.Horizontal.TProgressbar", troughcolor="#263238",
+                    background="#43a047", thickness=30)
+
+    panels_frame = ttk.Frame(root, style="TV.TFrame", padding=30)
+    panels_frame.pack(fill="both", expand=True)
+    hands_var = tk.StringVar()
+    ttk.Label(root, textvariable=hands_var, style="TVSub.TLabel",
+              justify="center", anchor="center").pack(fill="x", pady=(0, 30))
+    panels: list[dict] = []
+
+    def build_panels(count: int):
+        for w in panels_frame.winfo_children():
+            w.destroy()
+        panels.clear()
+        for i in range(count):
+            panels_frame.columnconfigure(i, weight=1)
+            col = ttk.Frame(panels_frame, style="TV.TFrame", padding=20)
+            col.grid(row=0, column=i, sticky="nsew")
+            name, score, sub = tk.StringVar(), tk.StringVar(), tk.StringVar()
+            ttk.Label(col, textvariable=name,  style="TVName.TLabel").pack()
+            ttk.Label(col, textvariable=score, style="TVScore.TLabel").pack()
+            prog = ttk.Progressbar(col, mode="determinate",
+                                   style="TV.Horizontal.TProgressbar")
+            prog.pack(fill="x", pady=10)
+            ttk.Label(col, textvariable=sub,   style="TVSub.TLabel").pack()
+            panels.append({"name": name, "score": score, "sub": sub, "prog": prog})
+
+    def repaint(board: dict):
+        if len(panels) != len(board["names"]):
+            build_panels(len(board["names"]))
+        for i, p in enumerate(panels):
+            total = board["totals"][i]
+            p["name"].set(board["names"][i])
+            p["score"].set(str(total))
+            p["prog"].configure(maximum=board["target"], value=min(max(total, 0), board["target"]))
+            if board["winner"] == i:
+                p["sub"].set("¡GANADOR! 🏆")
+            else:
+                p["sub"].set(f"Faltan {board['target'] - total} pts")
+        lines = [f"Mano {number}:   " + "   ".join(f"{pts:+}" for pts in pts_list)
+                 for number, pts_list in reversed(board["hands"])]
+        hands_var.set("\n".join(lines))
+
+    def poll():
+        try:
+            board = reader.read()
+        except (ValueError, OSError):
+            root.destroy()  # la app cerró el bloque
+            return
+        if board is not None:
+            repaint(board)
+        root.after(POLL_MS, poll)
+
+    poll()
+    root.mainloop()
+    reader.close()
+
+
+def start_display(publisher: ScoreboardPublisher) -> multiprocessing.Process:
+    # "spawn" en todas las plataformas: un fork copiaría el intérprete con Tk ya iniciado
+    ctx = multiprocessing.get_context("spawn")
+    proc = ctx.Process(target=run_display, args=(publisher.name,), daemon=True)
+    proc.start()
+    return proc
+
+
+if __name__ == "__main__":
+    run_display(sys.argv[1], standalone=True)
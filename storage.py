@@ -0,0 +1,260 @@
+"""
+storage.py - Carpeta compartida de partidas para varias computadoras
+
+Cada partida de la carpeta tiene tres archivos:
+- <id>.bjl  : foto completa en formato diario, con "store_version" en el encabezado
+- <id>.wal  : registro de escritura anticipada (una línea JSON por cambio)
+- <id>.lock : archivo de bloqueo del sistema operativo
+
+Los cambios (agregar, deshacer, corregir o borrar una mano) se agregan al .wal con fsync antes
+de darlos por hechos; cada CHECKPOINT_EVERY cambios se reescribe la foto y se
+vacía el .wal. Cada cambio lleva un número de versión: quien escribe indica
+sobre qué versión trabajó y, si otra computadora escribió antes, recibe
+ConflictError. El bloqueo es por partida, así que escrituras sobre partidas
+distintas no se esperan entre sí; las lecturas no bloquean.
+"""
+
+import json
+import os
+import time
+from dataclasses import asdict
+from typing import Optional
+
+from game import Game, RoundScore, JOURNAL_EXT, JournalReader
+
+CHECKPOINT_EVERY = 64
+LOCK_TIMEOUT = 10.0  # segundos
+WAL_EXT = ".wal"
+LOCK_EXT = ".lock"
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_fd(fd: int) -> bool:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def _unlock_fd(fd: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_fd(fd: int) -> bool:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock_fd(fd: int):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class ConflictError(Exception):
+    """Otra instancia modificó la partida después de que la leímos."""
+    def __init__(self, game_id: str, expected: int, current: int):
+        super().__init__(
+            f"La partida '{game_id}' cambió (versión {current}, se esperaba {expected}).")
+        self.game_id = game_id
+        self.expected = expected
+        self.current = current
+
+
+class FileLock:
+    """Bloqueo exclusivo sobre un archivo, con reintentos hasta LOCK_TIMEOUT."""
+
+    def __init__(self, path: str, timeout: float = LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._fd: Optional[int] = None
+
+    def __enter__(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        deadline = time.monotonic() + self.timeout
+        delay = 0.005
+        while not _lock_fd(fd):
+            if time.monotonic() > deadline:
+                os.close(fd)
+                raise TimeoutError(f"No se pudo bloquear {self.path}.")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        self._fd = fd
+        return self
+
+    def __exit__(self, *_exc):
+        try:
+            _unlock_fd(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+def atomic_write(path: str, write, encoding: str = "utf-8", fsync: bool = True,
+                 binary: bool = False):
+    """
+    Escribe con write(f) en un temporal y lo reemplaza de una vez. Con
+    fsync=False el reemplazo sigue siendo atómico para quien lee, pero no se
+    espera a que llegue al disco (para archivos que se pueden regenerar).
+    Con binary=True, f se abre en modo binario y encoding no se usa.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with (open(tmp, "wb") if binary
+              else open(tmp, "w", encoding=encoding, newline="\n")) as f:
+            write(f)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class SharedGameStore:
+    def __init__(self, folder: str):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    # ── Rutas ─────────────────────────────────────────────────────────────────
+
+    def _path(self, game_id: str, ext: str) -> str:
+        return os.path.join(self.folder, game_id + ext)
+
+    def list_games(self) -> list[str]:
+        return sorted(name[:-len(JOURNAL_EXT)] for name in os.listdir(self.folder)
+                      if name.endswith(JOURNAL_EXT))
+
+    # ── Lectura ───────────────────────────────────────────────────────────────
+
+    def _snapshot_version(self, game_id: str) -> int:
+        path = self._path(game_id, JOURNAL_EXT)
+        if not os.path.exists(path):
+            return 0
+        reader = JournalReader(path)
+        reader.close()
+        return reader.header.get("store_version", 0)
+
+    def _read_wal(self, game_id: str) -> list[dict]:
+        path = self._path(game_id, WAL_EXT)
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # escritura a medias de otra instancia: todavía no cuenta
+                records.append(json.loads(line))
+        return records
+
+    def version(self, game_id: str) -> int:
+        records = self._read_wal(game_id)
+        return records[-1]["version"] if records else self._snapshot_version(game_id)
+
+    def load(self, game_id: str, retries: int = 5,
+             max_resident_rounds: Optional[int] = None) -> tuple[Game, int]:
+        """
+        Devuelve la partida y su versión, sin bloquear a quienes escriben.
+        max_resident_rounds: como en Game.load_header (por defecto, lo guardado).
+        """
+        for _ in range(retries):
+            path = self._path(game_id, JOURNAL_EXT)
+            game, reader = Game.load_header(path, max_resident_rounds)
+            game.hydrate_all(reader)
+            version = reader.header.get("store_version", 0)
+            records = self._read_wal(game_id)
+            # Si hubo un checkpoint entre leer la foto y el .wal, la foto ya es
+            # otra (y el .wal puede haber quedado vacío): se vuelve a leer todo
+            if self._snapshot_version(game_id) != version:
+                game.close()
+                continue
+            for record in records:
+                if record["version"] > version:
+                    self._apply(game, record)
+                    version = record["version"]
+            return game, version
+        raise ConflictError(game_id, -1, self.version(game_id))
+
+    @staticmethod
+    def _apply(game: Game, record: dict):
+        if record["op"] == "add":
+            game.add_round([RoundScore(**s) for s in record["scores"]])
+        elif record["op"] == "undo":
+            game.undo_last_round()
+        elif record["op"] == "edit":
+            game.edit_round(record["number"], [RoundScore(**s) for s in record["scores"]])
+        elif record["op"] == "delete":
+            game.delete_round(record["number"])
+        else:
+            raise ValueError(f"Operación desconocida en el registro: {record['op']}")
+
+    # ── Escritura ─────────────────────────────────────────────────────────────
+
+    def _check(self, game_id: str, expected_version: int) -> int:
+        current = self.version(game_id)
+        if current != expected_version:
+            raise ConflictError(game_id, expected_version, current)
+        return current
+
+    def save(self, game_id: str, game: Game, expected_version: int) -> int:
+        """Escribe la partida completa (nueva o reemplazo) y vacía el .wal."""
+        with FileLock(self._path(game_id, LOCK_EXT)):
+            version = self._check(game_id, expected_version) + 1
+            self._write_snapshot(game_id, game, version)
+        return version
+
+    def append_round(self, game_id: str, scores: list[RoundScore], expected_version: int) -> int:
+        record = {"op": "add", "scores": [asdict(s) for s in scores]}
+        return self._append(game_id, record, expected_version)
+
+    def undo_round(self, game_id: str, expected_version: int) -> int:
+        return self._append(game_id, {"op": "undo"}, expected_version)
+
+    def edit_round(self, game_id: str, number: int, scores: list[RoundScore],
+                   expected_version: int) -> int:
+        record = {"op": "edit", "number": number, "scores": [asdict(s) for s in scores]}
+        return self._append(game_id, record, expected_version)
+
+    def delete_round(self, game_id: str, number: int, expected_version: int) -> int:
+        return self._append(game_id, {"op": "delete", "number": number}, expected_version)
+
+    def _append(self, game_id: str, record: dict, expected_version: int) -> int:
+        with FileLock(self._path(game_id, LOCK_EXT)):
+            version = self._check(game_id, expected_version) + 1
+            record = {"version": version, **record}
+            with open(self._path(game_id, WAL_EXT), "a", encoding="utf-8", newline="\n") as f:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if len(self._read_wal(game_id)) >= CHECKPOINT_EVERY:
+                self._checkpoint(game_id)
+        return version
+
+    def _checkpoint(self, game_id: str):
+        """
+        Reescribe la foto con lo que hay en el .wal. El cambio ya quedó firme
+        en el .wal, así que si esto falla (p. ej. en Windows, os.replace
+        mientras otra computadora lee la foto) se deja el .wal como está y
+        se reintenta en el próximo cambio.
+        """
+        try:
+            game, loaded_version = self.load(game_id)
+            try:
+                self._write_snapshot(game_id, game, loaded_version)
+            finally:
+                game.close()
+        except (OSError, ConflictError):
+            pass
+
+    def _write_snapshot(self, game_id: str, game: Game, version: int):
+        atomic_write(self._path(game_id, JOURNAL_EXT),
+                     lambda f: game.write_journal(f, {"store_version": version}))
+        # Se vacía en lugar de borrarse: en Windows no se puede borrar un archivo abierto
+        wal = self._path(game_id, WAL_EXT)
+        if os.path.exists(wal):
+            open(wal, "w").close()
@@ -2,10 +2,23 @@
 ui.py - Interfaz principal de la aplicación Buraco
 """
 
+import os
+import time
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-from game import Game, RoundScore, TARGET_SCORE
+from tkinter import ttk, messagebox, filedialog, simpledialog
+from game import (Game, RoundScore, TARGET_SCORE, JOURNAL_EXT, LONG_GAME_RESIDENT_ROUNDS,
+                  JournalReader, hand_breakdown)
 from round_dialog import RoundDialog
+from layout import ScrollLayout
+from ratings import RatingEngine, GameResult, load_archive
+from storage import SharedGameStore, ConflictError
+from spectator import ScoreboardPublisher, start_display
+from website import SitePublisher
+from events import EventLog, events_path
+from chart import ScoreChart, load_overlays
+from analytics import season_report
+
+OLDER_ROW = "older"  # fila del historial que trae del disco las manos paginadas anteriores
 
 
 class BuracoApp(tk.Tk):
@@ -14,6 +27,27 @@ class BuracoApp(tk.Tk):
         self.title("🃏 Buraco - Contador de Puntajes")
         self.minsize(680, 520)
         self.game: Game | None = None
+        # Partidas paginadas: primera mano (posición) que se ve en el historial;
+        # None → solo las que están en memoria
+        self._history_start: int | None = None
+        self._hydrate_job: str | None = None
+        self._hydrate_reader: JournalReader | None = None
+        self.ratings = self._load_ratings()
+        # Partida abierta desde una carpeta compartida: (store, id, versión)
+        self._shared: tuple[SharedGameStore, str, int] | None = None
+        self._round_dialog: RoundDialog | None = None
+        # Registro de cambios de la partida actual y, al abrir un diario, su .events
+        self._events: EventLog | None = None
+        self._events_source: str | None = None
+        # Ventanas de ayuda: se arman la primera vez y después solo se muestran
+        self._help_windows: dict[str, tk.Toplevel] = {}
+        # Marcador para espectadores (TV) en otro proceso
+        self._spectator_var = tk.BooleanVar(value=False)
+        self._publisher: ScoreboardPublisher | None = None
+        self._display_proc = None
+        # Sitio estático para la red local: (publicador, mesa, partida publicada)
+        self._site_var = tk.BooleanVar(value=False)
+        self._site: tuple[SitePublisher, str, Game | None] | None = None
 
         self._apply_style()
         self._build_menu()
@@ -59,12 +93,36 @@ class BuracoApp(tk.Tk):
         game_menu.add_command(label="Abrir partida...", command=self._load_game, accelerator="Ctrl+O")
         game_menu.add_command(label="Guardar partida...", command=self._save_game, accelerator="Ctrl+S")
         game_menu.add_separator()
-        game_menu.add_command(label="Salir", command=self.quit)
+        game_menu.add_command(label="Abrir de carpeta compartida...", command=self._open_shared)
+        game_menu.add_command(label="Guardar en carpeta compartida...", command=self._save_shared)
+        game_menu.add_command(label="Historial de cambios...", command=self._show_event_log)
+        game_menu.add_command(label="Comparar con partidas de una carpeta...",
+                              command=self._load_chart_overlays)
+        game_menu.add_command(label="Quitar comparación", command=lambda: self.chart.set_overlays([]))
+        game_menu.add_separator()
+        game_menu.add_checkbutton(label="Pantalla para espectadores (TV)",
+                                  variable=self._spectator_var,
+                                  command=self._toggle_spectator)
+        game_menu.add_checkbutton(label="Publicar en la red local (web)...",
+                                  variable=self._site_var,
+                                  command=self._toggle_site)
+        game_menu.add_separator()
+        game_menu.add_command(label="Salir", command=self.destroy)
         menubar.add_cascade(label="Partida", menu=game_menu)
 
+        rank_menu = tk.Menu(menubar, tearoff=0)
+        rank_menu.add_command(label="Ver ranking", command=self._show_ranking)
+        rank_menu.add_command(label="Recalcular desde carpeta...", command=self._recompute_ranking)
+        rank_menu.add_separator()
+        rank_menu.add_command(label="Informe de temporada...", command=self._show_season_report)
+        menubar.add_cascade(label="Ranking", menu=rank_menu)
+
         help_menu = tk.Menu(menubar, tearoff=0)
         help_menu.add_command(label="Valores de fichas", command=self._show_card_values)
         help_menu.add_command(label="Reglas de puntaje",  command=self._show_rules)
+        help_menu.add_separator()
+        help_menu.add_command(label="Rendimiento de la ventana",
+                              command=lambda: self.status_var.set(self._layout.describe()))
         menubar.add_cascade(label="Ayuda", menu=help_menu)
 
         self.config(menu=menubar)
@@ -88,48 +146,23 @@ class BuracoApp(tk.Tk):
         self.main_frame = ttk.Frame(self._canvas, padding=12)
         self._canvas_window = self._canvas.create_window((0, 0), window=self.main_frame, anchor="nw")
 
-        self.main_frame.columnconfigure(0, weight=1)
+        self.main_frame.columnconfigure(0, weight=3)
+        self.main_frame.columnconfigure(1, weight=2)
         self.main_frame.rowconfigure(0, weight=0)
         self.main_frame.rowconfigure(1, weight=1)
         self.main_frame.rowconfigure(2, weight=0)
         self.main_frame.rowconfigure(3, weight=0)
 
-        self._canvas.bind("<Configure>",       self._on_canvas_resize)
-        self.main_frame.bind("<Configure>",    self._on_frame_resize)
-        self._canvas.bind_all("<MouseWheel>",  self._on_mousewheel)
-        self._canvas.bind_all("<Button-4>",    self._on_mousewheel)
-        self._canvas.bind_all("<Button-5>",    self._on_mousewheel)
+        self._layout = ScrollLayout(self._canvas, self._canvas_window, self.main_frame)
 
         self._build_main_content()
 
-    def _on_canvas_resize(self, event):
-        canvas_w, canvas_h = event.width, event.height
-        self._canvas.itemconfig(self._canvas_window, width=canvas_w)
-        frame_h = self.main_frame.winfo_reqheight()
-        self._canvas.itemconfig(self._canvas_window, height=max(frame_h, canvas_h))
-        self._canvas.configure(scrollregion=(0, 0, canvas_w, max(frame_h, canvas_h)))
-
-    def _on_frame_resize(self, _event=None):
-        canvas_h = self._canvas.winfo_height()
-        frame_h  = self.main_frame.winfo_reqheight()
-        canvas_w = self._canvas.winfo_width()
-        self._canvas.itemconfig(self._canvas_window, height=max(frame_h, canvas_h))
-        self._canvas.configure(scrollregion=(0, 0, canvas_w, max(frame_h, canvas_h)))
-
-    def _on_mousewheel(self, event):
-        if event.num == 4:
-            self._canvas.yview_scroll(-1, "units")
-        elif event.num == 5:
-            self._canvas.yview_scroll(1, "units")
-        else:
-            self._canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-
     def _build_main_content(self):
         PAD = 8
 
         # ── Fila 0: Marcador (se reconstruye al iniciar partida) ──────────────
         self.score_frame = ttk.Frame(self.main_frame)
-        self.score_frame.grid(row=0, column=0, sticky="ew", pady=(0, PAD))
+        self.score_frame.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, PAD))
         self.team_panels: list[dict] = []
 
         # ── Fila 1: Historial ─────────────────────────────────────────────────
@@ -141,9 +174,17 @@ class BuracoApp(tk.Tk):
 
         self._build_history_table(["Equipo 1", "Equipo 2"])  # placeholder hasta iniciar partida
 
+        # Gráfico de evolución, al lado del historial (sigue a la partida actual)
+        chart_frame = ttk.LabelFrame(self.main_frame, text="  Evolución  ", padding=8)
+        chart_frame.grid(row=1, column=1, sticky="nsew", padx=(PAD, 0), pady=(0, PAD))
+        chart_frame.rowconfigure(0, weight=1)
+        chart_frame.columnconfigure(0, weight=1)
+        self.chart = ScoreChart(chart_frame)
+        self.chart.grid(row=0, column=0, sticky="nsew")
+
         # ── Fila 2: Botones ───────────────────────────────────────────────────
         btn_frame = ttk.Frame(self.main_frame)
-        btn_frame.grid(row=2, column=0, sticky="ew", pady=(0, 4))
+        btn_frame.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(0, 4))
         btn_frame.columnconfigure(1, weight=1)
 
         self.btn_new_round = ttk.Button(btn_frame, text="➕ Nueva Mano",
@@ -162,7 +203,7 @@ class BuracoApp(tk.Tk):
         self.status_var = tk.StringVar(value="Iniciá una nueva partida para comenzar.")
         ttk.Label(self.main_frame, textvariable=self.status_var,
                   style="Sub.TLabel", anchor="center").grid(
-            row=3, column=0, sticky="ew", pady=(0, 4))
+            row=3, column=0, columnspan=2, sticky="ew", pady=(0, 4))
 
     def _build_score_panels(self, team_names: list[str]):
         """Construye los paneles de puntaje dinámicamente según la cantidad de equipos."""
@@ -206,6 +247,7 @@ class BuracoApp(tk.Tk):
                 "frame": col, "name": name_var,
                 "score": score_var, "diff": diff_var, "prog": prog,
             })
+        self._layout.invalidate()
 
     def _build_history_table(self, team_names: list[str]):
         """Reconstruye la tabla del historial con columnas dinámicas."""
@@ -229,6 +271,23 @@ class BuracoApp(tk.Tk):
         tree_scroll.grid(row=0, column=1, sticky="ns")
         self.tree.configure(yscrollcommand=tree_scroll.set)
 
+        # Corrección de manos anteriores
+        self.tree.bind("<Double-1>", lambda _: self._on_history_double_click())
+        self.tree.tag_configure(OLDER_ROW, foreground="gray")
+        self.tree.bind("<Delete>",   lambda _: self._delete_selected_round())
+        self.tree.bind("<Button-3>", self._on_history_menu)
+        self._hist_menu = tk.Menu(self.tree, tearoff=0)
+        self._hist_menu.add_command(label="Corregir mano...", command=self._edit_selected_round)
+        self._hist_menu.add_command(label="Borrar mano",      command=self._delete_selected_round)
+        # Detalle de la mano al pasar el mouse
+        _HoverTip(self.tree, self._round_breakdown)
+
+        self.stats_var = tk.StringVar(value="")
+        ttk.Label(self.hist_frame, textvariable=self.stats_var,
+                  style="Sub.TLabel", anchor="w").grid(
+            row=1, column=0, columnspan=2, sticky="ew", pady=(6, 0))
+        self._layout.invalidate()
+
     def _show_welcome(self):
         self._build_score_panels(["—", "—"])
         for p in self.team_panels:
@@ -239,6 +298,8 @@ class BuracoApp(tk.Tk):
     # ── Acciones ──────────────────────────────────────────────────────────────
 
     def _new_game(self):
+        if self.game and self.game.is_loading:
+            return
         # ── Aviso si hay una partida en curso ─────────────────────────────────
         if self.game and not self.game.is_over and self.game.rounds:
             response = _GameInProgressDialog(self).response
@@ -253,37 +314,55 @@ class BuracoApp(tk.Tk):
             return
 
         names = dlg.result
-        self.game = Game(names)
+        self._cancel_hydration()
+        self._set_game(Game(names, LONG_GAME_RESIDENT_ROUNDS if dlg.long_game else None))
+        self._shared = None
         self._build_score_panels(names)
         self._build_history_table(names)
         self._refresh_ui()
         self.btn_new_round.config(state="normal")
         self.btn_undo.config(state="disabled")
         self.status_var.set(f"¡Partida iniciada! Objetivo: {TARGET_SCORE} puntos.")
+        # Se arma ahora para que la primera "Nueva Mano" abra al instante
+        self.after_idle(lambda: self._get_round_dialog(names))
+
+    def _get_round_dialog(self, names: list[str]) -> RoundDialog:
+        """Devuelve el formulario de mano reutilizable, armándolo si cambiaron los equipos."""
+        dlg = self._round_dialog
+        if dlg is None or dlg.team_names != names:
+            if dlg is not None:
+                dlg.destroy()
+            dlg = self._round_dialog = RoundDialog(self, self.game.current_round, names)
+        return dlg
 
     def _add_round(self):
-        if not self.game or self.game.is_over:
+        if not self.game or self.game.is_over or self.game.is_loading:
             return
-        names = [t.name for t in self.game.teams]
-        dlg = RoundDialog(self, self.game.current_round, names)
-        self.wait_window(dlg)
-
-        scores = list(dlg.result)
+        dlg = self._get_round_dialog([t.name for t in self.game.teams])
+        scores = list(dlg.ask(self.game.current_round,
+                              totals=[t.total for t in self.game.teams]))
         if any(not isinstance(s, RoundScore) for s in scores):
             return
+        if not self._push_shared(lambda st, gid, v: st.append_round(gid, scores, v)):
+            return
 
         self.game.add_round(scores)
         self._refresh_ui()
         self.btn_undo.config(state="normal")
 
         if self.game.is_over:
+            self._record_rating()
             self._show_winner()
 
     def _undo_round(self):
-        if not self.game or not self.game.rounds:
+        if not self.game or not self.game.rounds or self.game.is_loading:
             return
         if messagebox.askyesno("Deshacer", "¿Deshacer la última mano?", parent=self):
+            if not self._push_shared(lambda st, gid, v: st.undo_round(gid, v)):
+                return
             self.game.undo_last_round()
+            if not self.game.is_over:
+                self._unrecord_rating()
             self._refresh_ui()
             self.btn_new_round.config(
                 state="disabled" if self.game.is_over else "normal"
@@ -291,61 +370,380 @@ class BuracoApp(tk.Tk):
             if not self.game.rounds:
                 self.btn_undo.config(state="disabled")
 
+    def _selected_round_number(self) -> int | None:
+        if not self.game or self.game.is_loading:
+            return None
+        selection = self.tree.selection()
+        if not selection or selection[0] == OLDER_ROW:
+            return None
+        # Antes de buscar la mano o preguntar nada: las paginadas no se corrigen
+        if self.game.is_paged:
+            messagebox.showinfo("Historial paginado",
+                                "No se pueden corregir manos con el historial paginado.")
+            return None
+        return int(self.tree.item(selection[0], "values")[0])
+
+    def _round_breakdown(self, item: str) -> str:
+        """Texto del tooltip de una fila del historial (sale del caché de game.py)."""
+        if not self.game or not self.game.rounds or item == OLDER_ROW:
+            return ""
+        number = int(self.tree.item(item, "values")[0])
+        pos = number - self.game.rounds[0].number
+        if not 0 <= pos < len(self.game.rounds):
+            return ""
+        return hand_breakdown(self.game.rounds[pos].scores)
+
+    def _on_history_menu(self, event):
+        item = self.tree.identify_row(event.y)
+        if not item or item == OLDER_ROW or not self.game:
+            return
+        self.tree.selection_set(item)
+        self._hist_menu.tk_popup(event.x_root, event.y_root)
+
+    def _on_history_double_click(self):
+        if self.tree.selection() == (OLDER_ROW,):
+            self._load_older_hands()
+        else:
+            self._edit_selected_round()
+
+    def _history_first(self, game: Game) -> int:
+        """Posición de la primera mano que se muestra de una partida paginada."""
+        spilled = len(game.rounds) - len(game.rounds.resident)
+        return spilled if self._history_start is None else min(self._history_start, spilled)
+
+    def _load_older_hands(self):
+        """Trae del disco la página anterior a las manos que se ven en el historial."""
+        game = self.game
+        if not game or not game.is_paged:
+            return
+        self._history_start = max(0, self._history_first(game) - game.rounds.page_size)
+        self._refresh_ui()
+        # _refresh_ui deja a la vista la última mano: volver a las recién cargadas
+        children = self.tree.get_children()
+        if children:
+            self.tree.see(children[0])
+        self.status_var.set(f"Historial desde la mano {game.rounds[self._history_start].number}.")
+
+    def _edit_selected_round(self):
+        number = self._selected_round_number()
+        if number is None:
+            return
+        rnd = next(r for r in self.game.rounds if r.number == number)
+        dlg = self._get_round_dialog([t.name for t in self.game.teams])
+        scores = list(dlg.ask(number, initial=rnd.scores))
+        if any(not isinstance(s, RoundScore) for s in scores):
+            return
+        self._correct_round(
+            lambda: self.game.edit_round(number, scores),
+            lambda st, gid, v: st.edit_round(gid, number, scores, v),
+            f"Mano {number} corregida.")
+
+    def _delete_selected_round(self):
+        number = self._selected_round_number()
+        if number is None:
+            return
+        if not messagebox.askyesno(
+                "Borrar mano",
+                f"¿Borrar la mano {number}? Las siguientes se renumeran.", parent=self):
+            return
+        self._correct_round(
+            lambda: self.game.delete_round(number),
+            lambda st, gid, v: st.delete_round(gid, number, v),
+            f"Mano {number} borrada.")
+
+    def _correct_round(self, apply, push, status: str):
+        """Aplica una corrección de una mano anterior y actualiza ganador y ranking."""
+        was_over = self.game.is_over
+        prev_winner = self.game.winner.name if was_over else None
+        if not self._push_shared(push):
+            return
+        apply()
+        if was_over:
+            self._unrecord_rating()
+        self._refresh_ui()
+        self.status_var.set(status)
+        self.btn_new_round.config(state="disabled" if self.game.is_over else "normal")
+        self.btn_undo.config(state="normal" if self.game.rounds else "disabled")
+        if self.game.is_over:
+            self._record_rating()
+            if self.game.winner.name != prev_winner:
+                self._show_winner()
+
     def _save_game(self):
         if not self.game:
             messagebox.showinfo("Sin partida", "No hay ninguna partida activa.")
             return
+        if self.game.is_loading:
+            messagebox.showinfo("Cargando", "Esperá a que termine de cargarse la partida.")
+            return
         path = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("Partida Buraco", "*.json"), ("Todos", "*.*")],
+            filetypes=[("Partida Buraco", "*.json"),
+                       ("Diario Buraco", f"*{JOURNAL_EXT}"), ("Todos", "*.*")],
             title="Guardar partida"
         )
         if path:
             self.game.save(path)
+            if path.endswith(JOURNAL_EXT) and self._events is not None:
+                self._events.save(events_path(path))
             self.status_var.set(f"Partida guardada en {path}")
 
     def _load_game(self):
         path = filedialog.askopenfilename(
-            filetypes=[("Partida Buraco", "*.json"), ("Todos", "*.*")],
+            filetypes=[("Partida Buraco", f"*.json *{JOURNAL_EXT}"), ("Todos", "*.*")],
             title="Abrir partida"
         )
         if not path:
             return
+        self._cancel_hydration()
+        self._shared = None
         try:
-            self.game = Game.load(path)
-            names = [t.name for t in self.game.teams]
-            self._build_score_panels(names)
-            self._build_history_table(names)
-            self._refresh_ui()
-            self.btn_new_round.config(state="normal" if not self.game.is_over else "disabled")
-            self.btn_undo.config(state="normal" if self.game.rounds else "disabled")
-            self.status_var.set(f"Partida cargada desde {path}")
+            if JournalReader.is_journal(path):
+                self._events_source = events_path(path)
+                self._load_journal(path)
+                return
+            self._show_game(Game.load(path), f"Partida cargada desde {path}")
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo cargar la partida:\n{e}")
 
+    def _set_game(self, game: Game | None):
+        """Reemplaza la partida actual y libera el historial paginado de la anterior."""
+        if self.game is not None and self.game is not game:
+            self.game.close()
+        self.game = game
+        self._history_start = None
+
+    def _show_game(self, game: Game, status: str):
+        """Muestra una partida ya cargada por completo."""
+        self._set_game(game)
+        names = [t.name for t in game.teams]
+        self._build_score_panels(names)
+        self._build_history_table(names)
+        self._refresh_ui()
+        self.btn_new_round.config(state="normal" if not game.is_over else "disabled")
+        self.btn_undo.config(state="normal" if game.rounds else "disabled")
+        self.status_var.set(status)
+
+    # ── Carpeta compartida ────────────────────────────────────────────────────
+
+    def _open_shared(self):
+        path = filedialog.askopenfilename(
+            filetypes=[("Diario Buraco", f"*{JOURNAL_EXT}")],
+            title="Abrir de carpeta compartida"
+        )
+        if not path:
+            return
+        folder, name = os.path.split(path)
+        self._cancel_hydration()
+        try:
+            store = SharedGameStore(folder)
+            game_id = name[:-len(JOURNAL_EXT)]
+            game, version = store.load(game_id)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo abrir la partida compartida:\n{e}")
+            return
+        self._shared = (store, game_id, version)
+        self._show_game(game, f"Partida compartida '{game_id}' (versión {version})")
+
+    def _save_shared(self):
+        if not self.game or self.game.is_loading:
+            messagebox.showinfo("Sin partida", "No hay ninguna partida activa.")
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=JOURNAL_EXT,
+            filetypes=[("Diario Buraco", f"*{JOURNAL_EXT}")],
+            title="Guardar en carpeta compartida"
+        )
+        if not path:
+            return
+        folder, name = os.path.split(path)
+        store = SharedGameStore(folder)
+        game_id = name[:-len(JOURNAL_EXT)] if name.endswith(JOURNAL_EXT) else name
+        try:
+            # El diálogo ya confirmó el reemplazo si el archivo existía
+            version = store.save(game_id, self.game, store.version(game_id))
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo guardar la partida compartida:\n{e}")
+            return
+        self._shared = (store, game_id, version)
+        self.status_var.set(f"Partida compartida '{game_id}' guardada (versión {version})")
+
+    def _push_shared(self, write) -> bool:
+        """
+        Escribe un cambio en la carpeta compartida antes de aplicarlo localmente.
+        Si otra computadora cambió la partida, recarga la versión actual y
+        devuelve False para que el cambio no se aplique.
+        """
+        if self._shared is None:
+            return True
+        store, game_id, version = self._shared
+        try:
+            self._shared = (store, game_id, write(store, game_id, version))
+            return True
+        except ConflictError:
+            messagebox.showwarning(
+                "Partida modificada",
+                "Otra computadora modificó esta partida.\n"
+                "Se cargó la versión actual; volvé a ingresar el cambio si hace falta.",
+                parent=self)
+            game, version = store.load(game_id)
+            self._shared = (store, game_id, version)
+            self._show_game(game, f"Partida compartida '{game_id}' (versión {version})")
+        except (OSError, TimeoutError) as e:
+            messagebox.showerror("Error", f"No se pudo escribir en la carpeta compartida:\n{e}")
+        except ValueError as e:
+            # El cambio quedó en el .wal, pero la partida guardada no se pudo rearmar
+            messagebox.showerror("Error", f"La partida compartida está dañada:\n{e}")
+        return False
+
+    def _load_journal(self, path: str):
+        """Muestra el marcador con el encabezado y carga las manos de a lotes."""
+        game, reader = Game.load_header(path)
+        self._set_game(game)
+        names = [t.name for t in self.game.teams]
+        self._build_score_panels(names)
+        self._build_history_table(names)
+        self._refresh_scores()
+        self.btn_new_round.config(state="disabled")
+        self.btn_undo.config(state="disabled")
+        self.status_var.set(f"Cargando manos desde {path}...")
+        batches = reader.iter_batches()
+        acc = [0] * self.game.num_teams
+
+        def step():
+            self._hydrate_job = None
+            game = self.game
+            try:
+                batch = next(batches, None)
+                if batch is not None:
+                    # Las manos sin detalle no tienen fila, pero cuentan para los acumulados
+                    for hand in batch:
+                        if "totals" in hand:
+                            for i, pts in enumerate(hand["totals"]):
+                                acc[i] += pts
+                    rounds = game.hydrate(batch)
+                    if not game.is_paged:  # las paginadas muestran al final solo lo que quedó en memoria
+                        self._append_history_rows(rounds, acc)
+            except Exception as e:
+                self._abort_loading(f"No se pudo cargar la partida:\n{e}")
+                return
+            if batch is not None and game.is_loading:
+                self._hydrate_job = self.after(1, step)
+                return
+            self._cancel_hydration()
+            if game.is_loading:
+                self._abort_loading("El diario está incompleto: faltan manos.")
+                return
+            if game.is_paged:
+                self._refresh_ui()
+            else:
+                self._refresh_scores()
+                self._refresh_stats()
+            self.btn_new_round.config(state="normal" if not game.is_over else "disabled")
+            self.btn_undo.config(state="normal" if game.rounds else "disabled")
+            self.status_var.set(f"Partida cargada desde {path}")
+
+        self._hydrate_reader = reader
+        self._hydrate_job = self.after(1, step)
+
+    def _abort_loading(self, message: str):
+        """Descarta la partida a medio cargar y vuelve a la pantalla inicial."""
+        self._cancel_hydration()
+        self._set_game(None)
+        self._shared = None
+        self._events_source = None
+        if self._events is not None:
+            self._events.unfollow()
+            self._events = None
+        self.chart.follow(None)
+        self._build_history_table(["Equipo 1", "Equipo 2"])
+        self._show_welcome()
+        self.btn_new_round.config(state="disabled")
+        self.btn_undo.config(state="disabled")
+        self.status_var.set("Iniciá una nueva partida para comenzar.")
+        messagebox.showerror("Error", message)
+
+    def _cancel_hydration(self):
+        if self._hydrate_job is not None:
+            self.after_cancel(self._hydrate_job)
+            self._hydrate_job = None
+        if self._hydrate_reader is not None:
+            self._hydrate_reader.close()
+            self._hydrate_reader = None
+
     # ── Actualización de UI ───────────────────────────────────────────────────
 
     def _refresh_ui(self):
         if not self.game:
             return
 
+        self._refresh_scores()
+
+        # Historial: los acumulados arrancan después de las manos sin detalle
+        self.tree.delete(*self.tree.get_children())
+        game = self.game
+        if game.is_paged:
+            # Las manos en memoria y las páginas anteriores que se pidieron; las
+            # demás quedan detrás de una fila que las trae del disco
+            start = self._history_first(game)
+            rounds = [game.rounds[i] for i in range(start, len(game.rounds))]
+            acc = [t.total - sum(r.scores[i].total for r in rounds)
+                   for i, t in enumerate(game.teams)]
+            if start:
+                self.tree.insert("", "end", iid=OLDER_ROW, tags=(OLDER_ROW,), values=(
+                    "▲", f"{start} manos anteriores", "doble click para cargar"))
+        else:
+            rounds = game.rounds
+            legacy = game.legacy_hands
+            acc = [game.index.score_after(i, legacy) if legacy else 0
+                   for i in range(game.num_teams)]
+        self._append_history_rows(rounds, acc)
+        self._refresh_stats()
+
+        rounds_count = len(self.game.rounds)
+        self.status_var.set(
+            f"Mano {rounds_count} completada."
+            if rounds_count else "Partida lista. Ingresá la primera mano."
+        )
+
+    def _refresh_stats(self):
+        index = self.game.index
+        parts = []
+        lead = index.max_lead()
+        if lead:
+            team, pts, hand = lead
+            parts.append(f"Mayor ventaja: {self.game.teams[team].name} +{pts} (mano {hand})")
+        streak = index.longest_streak()
+        if streak and streak[1] > 1:
+            team, hands = streak
+            parts.append(f"Racha más larga: {self.game.teams[team].name}, {hands} manos seguidas")
+        self.stats_var.set("   ·   ".join(parts))
+
+    def _refresh_scores(self):
+        if self._publisher is not None:
+            self._publisher.publish(self.game)
+        self._sync_site()
+        self._sync_events()
+        if self.chart.game is not self.game and not self.game.is_loading:
+            self.chart.follow(self.game)
         for i, team in enumerate(self.game.teams):
             if i >= len(self.team_panels):
                 break
             p = self.team_panels[i]
             p["name"].set(team.name)
             p["score"].set(str(team.total))
-            if team.has_won:
+            if team is self.game.winner:
                 p["diff"].set("¡GANADOR! 🏆")
+            elif team.has_won:  # llegó, pero en una mano posterior a la del ganador
+                p["diff"].set(f"Llegó a {TARGET_SCORE} después del ganador")
             else:
                 p["diff"].set(f"Faltan {TARGET_SCORE - team.total} pts")
             p["prog"]["value"] = min(team.total, TARGET_SCORE)
 
-        # Historial
-        self.tree.delete(*self.tree.get_children())
+    def _append_history_rows(self, rounds, acc: list[int]):
+        """Agrega filas al historial; acc lleva los acumulados y se actualiza en el lugar."""
         n = self.game.num_teams
-        acc = [0] * n
-        for rnd in self.game.rounds:
+        for rnd in rounds:
             round_scores = [rnd.scores[i].total for i in range(n)]
             for i in range(n):
                 acc[i] += round_scores[i]
@@ -359,12 +757,6 @@ class BuracoApp(tk.Tk):
         if children:
             self.tree.see(children[-1])
 
-        rounds_count = len(self.game.rounds)
-        self.status_var.set(
-            f"Mano {rounds_count} completada."
-            if rounds_count else "Partida lista. Ingresá la primera mano."
-        )
-
     def _show_winner(self):
         if not self.game or self.game.winner is None:
             return
@@ -386,12 +778,206 @@ class BuracoApp(tk.Tk):
 
         messagebox.showinfo("🏆 ¡Fin de la partida!", msg)
 
+    # ── Pantalla para espectadores ────────────────────────────────────────────
+
+    def _toggle_spectator(self):
+        if self._spectator_var.get():
+            self._publisher = ScoreboardPublisher()
+            self._publisher.publish(self.game)
+            self._display_proc = start_display(self._publisher)
+            self._watch_spectator()
+        else:
+            self._stop_spectator()
+
+    def _watch_spectator(self):
+        # Si cerraron la ventana de la TV, se apaga la publicación
+        if self._display_proc is None:
+            return
+        if not self._display_proc.is_alive():
+            self._stop_spectator()
+            return
+        self.after(1000, self._watch_spectator)
+
+    def _stop_spectator(self):
+        if self._display_proc is not None:
+            if self._display_proc.is_alive():
+                self._display_proc.terminate()
+            self._display_proc.join(timeout=1)
+            self._display_proc = None
+        if self._publisher is not None:
+            self._publisher.close()
+            self._publisher = None
+        self._spectator_var.set(False)
+
+    def destroy(self):
+        self._stop_spectator()
+        self._stop_site()
+        if self.game is not None:
+            self.game.close()
+        super().destroy()
+
+    # ── Registro de cambios ───────────────────────────────────────────────────
+
+    def _sync_events(self):
+        """Sigue a la partida actual; al abrir un diario retoma su .events si coincide."""
+        game = self.game
+        if game is None or game.is_loading or (self._events and self._events.game is game):
+            return
+        if self._events is not None:
+            self._events.unfollow()
+            self._events = None
+        source, self._events_source = self._events_source, None
+        if game.is_paged:
+            return  # el registro guardaría todas las manos que el historial pagina
+        try:
+            log = EventLog.load(source) if source and os.path.exists(source) else None
+            if log is None or not log.matches(game):
+                log = EventLog.from_game(game)
+        except (OSError, ValueError, KeyError):
+            return  # p. ej. partidas .json, que no tienen el detalle de las manos
+        log.follow(game)
+        self._events = log
+
+    def _load_chart_overlays(self):
+        folder = filedialog.askdirectory(title="Carpeta con partidas para comparar")
+        if not folder:
+            return
+        curves = load_overlays(folder)
+        self.chart.set_overlays(curves)
+        self.status_var.set(f"{len(curves)} partidas superpuestas en el gráfico.")
+
+    def _show_event_log(self):
+        if self._events is None:
+            messagebox.showinfo("Historial de cambios",
+                                "Esta partida no tiene registro de cambios "
+                                "(las partidas .json no guardan el detalle de las manos).")
+            return
+        EventLogDialog(self, self._events)
+
+    # ── Publicación web ───────────────────────────────────────────────────────
+
+    def _toggle_site(self):
+        if not self._site_var.get():
+            self._stop_site()
+            return
+        folder = filedialog.askdirectory(title="Carpeta del sitio (servirla con un servidor estático)")
+        table_id = folder and simpledialog.askstring(
+            "Publicar en la red local", "Nombre de la mesa:", initialvalue="mesa1", parent=self)
+        if not table_id:
+            self._site_var.set(False)
+            return
+        try:
+            self._site = (SitePublisher(folder, on_error=self._on_site_error), table_id, None)
+            self._sync_site()
+        except (OSError, ValueError) as e:
+            self._stop_site()
+            messagebox.showerror("Error", f"No se pudo publicar la mesa:\n{e}")
+            return
+        self.status_var.set(f"Mesa '{table_id}' publicada en {folder}")
+
+    def _sync_site(self):
+        """Sigue a la partida actual: el publicador se actualiza solo con cada cambio."""
+        if self._site is None:
+            return
+        site, table_id, published = self._site
+        if published is self.game or self.game is None or self.game.is_loading:
+            return
+        names = " vs ".join(t.name for t in self.game.teams)
+        site.attach(table_id, self.game, title=f"{table_id}: {names}")
+        self._site = (site, table_id, self.game)
+
+    def _on_site_error(self, error: OSError):
+        # Llega en medio del cambio de la partida: el aviso se muestra después
+        self._site = None
+        self._site_var.set(False)
+        self.after_idle(lambda: messagebox.showwarning(
+            "Publicación web", f"Se dejó de publicar la mesa:\n{error}", parent=self))
+
+    def _stop_site(self):
+        if self._site is not None:
+            self._site[0].close()
+            self._site = None
+        self._site_var.set(False)
+
+    # ── Ranking ───────────────────────────────────────────────────────────────
+
+    def _load_ratings(self) -> RatingEngine:
+        try:
+            return RatingEngine.load()
+        except (OSError, ValueError, KeyError, TypeError):
+            return RatingEngine()
+
+    def _save_ratings(self):
+        try:
+            self.ratings.save()
+        except OSError as e:
+            messagebox.showwarning("Ranking", f"No se pudo guardar el ranking:\n{e}")
+
+    def _record_rating(self):
+        # El id es el de la partida: si ya se había registrado en otra sesión, se reemplaza
+        result = GameResult.from_game(self.game)
+        if self.ratings.is_recorded(result.game_id):
+            self.ratings.undo(result.game_id)
+        self.ratings.record(result)
+        self._save_ratings()
+
+    def _unrecord_rating(self):
+        if not self.ratings.is_recorded(self.game.game_id):
+            return
+        self.ratings.undo(self.game.game_id)
+        self._save_ratings()
+
+    def _show_ranking(self):
+        RankingDialog(self, self.ratings.ranking())
+
+    def _recompute_ranking(self):
+        folder = filedialog.askdirectory(title="Carpeta con partidas guardadas")
+        if not folder:
+            return
+        if not messagebox.askyesno(
+                "Recalcular ranking",
+                "Se reemplaza el ranking actual por el calculado con las partidas "
+                "terminadas de la carpeta. ¿Continuar?", parent=self):
+            return
+        results = load_archive(folder)
+        self.ratings.recompute(results)
+        self._save_ratings()
+        self.status_var.set(f"Ranking recalculado con {len(results)} partidas.")
+        self._show_ranking()
+
+    def _show_season_report(self):
+        folder = filedialog.askdirectory(title="Carpeta con las partidas de la temporada")
+        if not folder:
+            return
+        self.config(cursor="watch")
+        self.update_idletasks()
+        try:
+            report = season_report(folder)
+        except OSError as e:
+            messagebox.showerror("Error", f"No se pudo leer la carpeta:\n{e}")
+            return
+        finally:
+            self.config(cursor="")
+        SeasonReportDialog(self, os.path.basename(folder) or folder, report.format())
+
     # ── Diálogos de ayuda ─────────────────────────────────────────────────────
 
+    def _show_help(self, key: str, title: str, text: str):
+        """Muestra una ventana de ayuda; se arma una sola vez y al cerrarla se oculta."""
+        dlg = self._help_windows.get(key)
+        if dlg is None:
+            dlg = self._help_windows[key] = tk.Toplevel(self)
+            dlg.withdraw()
+            dlg.title(title)
+            dlg.resizable(False, False)
+            dlg.protocol("WM_DELETE_WINDOW", dlg.withdraw)
+            ttk.Label(dlg, text=text, font=("Courier", 11), padding=16, justify="left").pack()
+            ttk.Button(dlg, text="Cerrar", command=dlg.withdraw).pack(pady=8)
+        dlg.deiconify()
+        dlg.lift()
+        dlg.focus_set()
+
     def _show_card_values(self):
-        dlg = tk.Toplevel(self)
-        dlg.title("Valores de Fichas")
-        dlg.resizable(False, False)
         text = (
             "Ficha        Puntos\n"
             "──────────────────\n"
@@ -401,13 +987,9 @@ class BuracoApp(tk.Tk):
             "8 al 13      10 pts\n"
             "Comodín      50 pts\n"
         )
-        ttk.Label(dlg, text=text, font=("Courier", 11), padding=16, justify="left").pack()
-        ttk.Button(dlg, text="Cerrar", command=dlg.destroy).pack(pady=8)
+        self._show_help("cards", "Valores de Fichas", text)
 
     def _show_rules(self):
-        dlg = tk.Toplevel(self)
-        dlg.title("Reglas de Puntaje")
-        dlg.resizable(False, False)
         text = (
             "Jugada              Puntos\n"
             "───────────────────────────\n"
@@ -423,8 +1005,63 @@ class BuracoApp(tk.Tk):
             "al menos una canasta (pura o impura)\n"
             "y haber comprado el muerto."
         )
-        ttk.Label(dlg, text=text, font=("Courier", 11), padding=16, justify="left").pack()
-        ttk.Button(dlg, text="Cerrar", command=dlg.destroy).pack(pady=8)
+        self._show_help("rules", "Reglas de Puntaje", text)
+
+
+# ── Tooltip del historial ──────────────────────────────────────────────────────
+
+class _HoverTip:
+    """
+    Muestra el detalle de la fila bajo el mouse. Usa una sola ventana que se
+    mueve y cambia de texto; el texto solo se pide cuando cambia la fila.
+    """
+    DELAY_MS = 300
+
+    def __init__(self, tree: ttk.Treeview, text_for):
+        self.tree = tree
+        self.text_for = text_for
+        self.win = tk.Toplevel(tree)
+        self.win.withdraw()
+        self.win.overrideredirect(True)
+        self.label = tk.Label(self.win, justify="left", font=("Courier", 10),
+                              background="#ffffe0", relief="solid", borderwidth=1,
+                              padx=6, pady=4)
+        self.label.pack()
+        self._row = ""
+        self._job: str | None = None
+        tree.bind("<Motion>", self._on_motion, add="+")
+        tree.bind("<Leave>",  self._hide, add="+")
+        tree.bind("<ButtonPress>", self._hide, add="+")
+
+    def _on_motion(self, event):
+        row = self.tree.identify_row(event.y)
+        if row != self._row:
+            self._hide()
+            self._row = row
+            if row:
+                self._job = self.tree.after(self.DELAY_MS, self._show)
+        elif self.win.winfo_viewable():
+            self._place(event.x_root, event.y_root)
+
+    def _show(self):
+        self._job = None
+        text = self.text_for(self._row) if self.tree.exists(self._row) else ""
+        if not text:
+            return
+        self.label.configure(text=text)
+        self._place(*self.tree.winfo_pointerxy())
+        self.win.deiconify()
+        self.win.lift()
+
+    def _place(self, x: int, y: int):
+        self.win.geometry(f"+{x + 16}+{y + 12}")
+
+    def _hide(self, _event=None):
+        if self._job is not None:
+            self.tree.after_cancel(self._job)
+            self._job = None
+        self._row = ""
+        self.win.withdraw()
 
 
 # ── Diálogo: partida en curso ──────────────────────────────────────────────────
@@ -471,6 +1108,124 @@ class _GameInProgressDialog(tk.Toplevel):
         self.destroy()
 
 
+# ── Diálogo: ranking ───────────────────────────────────────────────────────────
+
+class RankingDialog(tk.Toplevel):
+    """Tabla de posiciones; recibe el ranking ya calculado (no recalcula nada)."""
+    def __init__(self, parent, ranking: list[tuple[str, float, int]]):
+        super().__init__(parent)
+        self.title("Ranking")
+        self.resizable(False, True)
+
+        frame = ttk.Frame(self, padding=12)
+        frame.pack(fill="both", expand=True)
+        frame.rowconfigure(0, weight=1)
+
+        cols = ("Pos.", "Nombre", "Rating", "Partidas")
+        tree = ttk.Treeview(frame, columns=cols, show="headings",
+                            style="Round.Treeview", height=15)
+        for c, width in zip(cols, (50, 200, 80, 80)):
+            tree.heading(c, text=c)
+            tree.column(c, width=width, anchor="w" if c == "Nombre" else "center")
+        tree.grid(row=0, column=0, sticky="nsew")
+        scroll = ttk.Scrollbar(frame, orient="vertical", command=tree.yview)
+        scroll.grid(row=0, column=1, sticky="ns")
+        tree.configure(yscrollcommand=scroll.set)
+
+        for pos, (name, rating, played) in enumerate(ranking, start=1):
+            tree.insert("", "end", values=(pos, name, f"{rating:.0f}", played))
+        if not ranking:
+            ttk.Label(frame, text="Todavía no hay partidas terminadas.",
+                      style="Sub.TLabel").grid(row=1, column=0, pady=(8, 0))
+
+        ttk.Button(frame, text="Cerrar", command=self.destroy).grid(
+            row=2, column=0, columnspan=2, pady=(8, 0))
+
+
+# ── Diálogo: informe de temporada ──────────────────────────────────────────────
+
+class SeasonReportDialog(tk.Toplevel):
+    """Muestra el informe ya calculado como texto de solo lectura."""
+    def __init__(self, parent, folder_name: str, text: str):
+        super().__init__(parent)
+        self.title(f"Informe de temporada - {folder_name}")
+        self.geometry("760x620")
+
+        frame = ttk.Frame(self, padding=12)
+        frame.pack(fill="both", expand=True)
+        frame.rowconfigure(0, weight=1)
+        frame.columnconfigure(0, weight=1)
+
+        body = tk.Text(frame, font=("Courier", 10), wrap="none")
+        body.insert("1.0", text)
+        body.configure(state="disabled")
+        body.grid(row=0, column=0, sticky="nsew")
+        vscroll = ttk.Scrollbar(frame, orient="vertical", command=body.yview)
+        vscroll.grid(row=0, column=1, sticky="ns")
+        hscroll = ttk.Scrollbar(frame, orient="horizontal", command=body.xview)
+        hscroll.grid(row=1, column=0, sticky="ew")
+        body.configure(yscrollcommand=vscroll.set, xscrollcommand=hscroll.set)
+
+        ttk.Button(frame, text="Cerrar", command=self.destroy).grid(
+            row=2, column=0, columnspan=2, pady=(8, 0))
+
+
+# ── Diálogo: historial de cambios ──────────────────────────────────────────────
+
+class EventLogDialog(tk.Toplevel):
+    """Lista de eventos de la partida; permite ver el marcador en cualquiera de ellos."""
+    def __init__(self, parent, log: EventLog):
+        super().__init__(parent)
+        self.title("Historial de cambios")
+        self.resizable(True, True)
+        self.log = log
+
+        frame = ttk.Frame(self, padding=12)
+        frame.pack(fill="both", expand=True)
+        frame.rowconfigure(0, weight=1)
+        frame.columnconfigure(0, weight=1)
+
+        cols = ("#", "Hora", "Cambio")
+        self.tree = ttk.Treeview(frame, columns=cols, show="headings",
+                                 style="Round.Treeview", height=15)
+        for c, width in zip(cols, (50, 140, 420)):
+            self.tree.heading(c, text=c)
+            self.tree.column(c, width=width, anchor="w" if c == "Cambio" else "center")
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        scroll = ttk.Scrollbar(frame, orient="vertical", command=self.tree.yview)
+        scroll.grid(row=0, column=1, sticky="ns")
+        self.tree.configure(yscrollcommand=scroll.set)
+
+        for event in log.history():
+            when = time.strftime("%d/%m %H:%M:%S", time.localtime(event.at))
+            self.tree.insert("", "end", iid=str(event.seq),
+                             values=(event.seq, when, event.describe()))
+        children = self.tree.get_children()
+        if children:
+            self.tree.see(children[-1])
+
+        self.state_var = tk.StringVar(value="Elegí un cambio para ver el marcador en ese momento.")
+        ttk.Label(frame, textvariable=self.state_var, style="Sub.TLabel").grid(
+            row=1, column=0, columnspan=2, sticky="w", pady=(8, 0))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+
+        ttk.Button(frame, text="Cerrar", command=self.destroy).grid(
+            row=2, column=0, columnspan=2, pady=(8, 0))
+
+    def _on_select(self, _event=None):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        try:
+            board = self.log.state_at(int(selection[0]))
+        except ValueError:
+            self.state_var.set("Ese cambio es anterior a la última compactación del registro.")
+            return
+        totals = "   ".join(f"{name}: {total}" for name, total in zip(board.teams, board.totals))
+        winner = f"   ·   Ganador: {board.winner}" if board.winner else ""
+        self.state_var.set(f"Después de este cambio ({board.hands} manos): {totals}{winner}")
+
+
 # ── Diálogo: nueva partida ─────────────────────────────────────────────────────
 
 class NewGameDialog(tk.Toplevel):
@@ -480,6 +1235,7 @@ class NewGameDialog(tk.Toplevel):
     - 3 jugadores → 3 nombres individuales
     - 4 jugadores → 2 nombres de equipo (equipos de 2)
     result: list[str] con los nombres, o None si se canceló
+    long_game: si se eligió paginar el historial (partida larga de liga)
     """
     def __init__(self, parent):
         super().__init__(parent)
@@ -487,8 +1243,10 @@ class NewGameDialog(tk.Toplevel):
         self.resizable(False, False)
         self.grab_set()
         self.result = None
+        self.long_game = False
 
         self._num_players = tk.IntVar(value=4)
+        self._long_game_var = tk.BooleanVar(value=False)
         self._entries: list[ttk.Entry] = []
 
         self._build_ui()
@@ -516,9 +1274,15 @@ class NewGameDialog(tk.Toplevel):
         self._names_frame.grid(row=3, column=0, columnspan=2)
         self._refresh_names()
 
+        ttk.Checkbutton(
+            frame, variable=self._long_game_var,
+            text=f"Partida larga (liga): dejar en memoria solo las últimas "
+                 f"{LONG_GAME_RESIDENT_ROUNDS} manos").grid(
+            row=4, column=0, columnspan=2, sticky="w", pady=(12, 0))
+
         # ── Botones ───────────────────────────────────────────────────────────
         btn_frame = ttk.Frame(frame)
-        btn_frame.grid(row=4, column=0, columnspan=2, pady=(16, 0))
+        btn_frame.grid(row=5, column=0, columnspan=2, pady=(16, 0))
         ttk.Button(btn_frame, text="✔ Comenzar",
                    command=self._confirm).pack(side="left", padx=4)
         ttk.Button(btn_frame, text="✖ Cancelar",
@@ -572,4 +1336,5 @@ class NewGameDialog(tk.Toplevel):
         names = [e.get().strip() or f"Jugador {i+1}" for i, e in enumerate(self._entries)]
         # Para 4 jugadores se usan los 2 nombres de equipo
         self.result = names
+        self.long_game = self._long_game_var.get()
         self.destroy()
\ No newline at end of file
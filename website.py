@@ -0,0 +1,313 @@
+"""
+website.py - Marcador de solo lectura como sitio estático (HTML/JSON)
+
+Para mostrar cada mesa en la red local sin levantar un servidor propio: la
+carpeta que se genera se puede servir con cualquier servidor de archivos
+estáticos (p. ej. `python -m http.server` dentro de la carpeta).
+
+    <carpeta>/index.html              lista de mesas
+    <carpeta>/<mesa>/index.html       página de la mesa (se escribe una vez)
+    <carpeta>/<mesa>/state.json       revisión de cada fragmento
+    <carpeta>/<mesa>/totals.html      totales y ganador
+    <carpeta>/<mesa>/last.html        última mano
+    <carpeta>/<mesa>/history-<k>.html manos de a CHUNK_HANDS
+
+SitePublisher se suscribe a los cambios de cada Game y solo vuelve a generar
+los fragmentos afectados: al agregar una mano, los totales, la última mano y
+el último tramo del historial; al corregir o borrar, desde el tramo de esa
+mano en adelante (cambian los acumulados). Un archivo cuyo contenido no
+cambió no se vuelve a escribir. La página consulta state.json cada pocos
+segundos y pide solo los fragmentos con revisión nueva.
+"""
+
+import html
+import json
+import os
+import re
+import zlib
+from dataclasses import dataclass, field
+from string import Template
+from typing import Callable, Optional
+
+from game import Game, TARGET_SCORE
+from storage import atomic_write
+
+CHUNK_HANDS = 50
+POLL_SECONDS = 3
+
+# ── Plantillas (se compilan una sola vez) ─────────────────────────────────────
+
+_PAGE = Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>$title - Buraco</title>
+<style>
+body { font-family: "Segoe UI", sans-serif; background: #101820; color: #eceff1; margin: 0; padding: 1em; }
+h1 { font-size: 1.4em; margin: 0 0 .5em; }
+.teams { display: flex; gap: 1em; flex-wrap: wrap; }
+.team { flex: 1; background: #1c2833; border-radius: 8px; padding: .8em; text-align: center; min-width: 9em; }
+.team .name { font-size: 1.2em; font-weight: bold; }
+.team .score { font-size: 3em; font-weight: bold; color: #ffd54f; }
+.team.winner { outline: 3px solid #43a047; }
+.bar { background: #263238; height: 10px; border-radius: 5px; }
+.bar div { background: #43a047; height: 10px; border-radius: 5px; }
+.muted { color: #b0bec5; }
+table { border-collapse: collapse; width: 100%; margin-top: .5em; }
+th, td { padding: .3em .5em; text-align: center; border-bottom: 1px solid #263238; }
+</style>
+</head>
+<body>
+<h1>🃏 $title</h1>
+<div id="totals"></div>
+<h2>Última mano</h2>
+<div id="last"></div>
+<h2>Historial</h2>
+<table id="history">
+<thead><tr><th>Mano</th>$headers</tr></thead>
+</table>
+<noscript>Esta página necesita JavaScript para actualizarse.</noscript>
+<script>
+var revs = {};
+function load(name, apply) {
+  return fetch(name, {cache: "no-store"}).then(function (r) { return r.text(); }).then(apply);
+}
+function chunkBody(k) {
+  var id = "chunk-" + k, el = document.getElementById(id);
+  if (!el) {
+    el = document.createElement("tbody");
+    el.id = id;
+    el.dataset.k = k;
+    var table = document.getElementById("history"), before = null;
+    table.querySelectorAll("tbody[data-k]").forEach(function (b) {
+      if (!before && Number(b.dataset.k) < k) { before = b; }
+    });
+    table.insertBefore(el, before);
+  }
+  return el;
+}
+function poll() {
+  fetch("state.json", {cache: "no-store"}).then(function (r) { return r.json(); }).then(function (state) {
+    Object.keys(state.revs).forEach(function (name) {
+      if (revs[name] === state.revs[name]) { return; }
+      revs[name] = state.revs[name];
+      var m = /^history-(\\d+)\\.html$$/.exec(name);
+      var el = m ? chunkBody(Number(m[1])) : document.getElementById(name.split(".")[0]);
+      load(name, function (text) { el.innerHTML = text; });
+    });
+    Object.keys(revs).forEach(function (name) {
+      var m = /^history-(\\d+)\\.html$$/.exec(name);
+      if (m && !(name in state.revs)) {
+        delete revs[name];
+        chunkBody(Number(m[1])).remove();
+      }
+    });
+  }).catch(function () {}).then(function () { setTimeout(poll, $poll_ms); });
+}
+poll();
+</script>
+</body>
+</html>
+""")
+
+_TEAM = Template("""<div class="team$css"><div class="name">$name</div>\
+<div class="score">$total</div>\
+<div class="bar"><div style="width: $percent%"></div></div>\
+<div class="muted">$note</div></div>""")
+
+_TOTALS = Template("""<div class="teams">$teams</div>
+<p class="muted">Mano actual: $current_round · Objetivo: $target</p>""")
+
+_LAST = Template("""<table><tr><th>Mano $number</th>$cells</tr></table>""")
+
+_ROW = Template("""<tr><td>$number</td>$cells</tr>""")
+
+_INDEX = Template("""<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>Buraco - Mesas</title></head>
+<body style="font-family: 'Segoe UI', sans-serif;">
+<h1>🃏 Mesas</h1>
+<ul>
+$items
+</ul>
+</body>
+</html>
+""")
+
+_INDEX_ITEM = Template("""<li><a href="$table_id/index.html">$title</a></li>""")
+
+
+def _safe_id(table_id: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_-]+", "-", table_id).strip("-")
+    if not safe:
+        raise ValueError(f"Nombre de mesa inválido: {table_id!r}")
+    return safe
+
+
+@dataclass
+class _Table:
+    table_id: str
+    title: str
+    game: Game
+    listener: object = None
+    chunks: int = 0
+    # Fragmento → revisión (crc32 del contenido) de lo último escrito
+    revs: dict[str, int] = field(default_factory=dict)
+
+
+class SitePublisher:
+    def __init__(self, folder: str, on_error: Optional[Callable[[OSError], None]] = None):
+        """
+        on_error(error) se llama si una actualización no se pudo escribir; en
+        ese caso el publicador deja de seguir todas las mesas.
+        """
+        self.folder = folder
+        self.on_error = on_error
+        os.makedirs(folder, exist_ok=True)
+        self._tables: dict[str, _Table] = {}
+        self._written: dict[str, int] = {}  # ruta → crc32 de lo último escrito
+        self.writes = 0  # archivos escritos de verdad (para medir)
+
+    # ── Mesas ─────────────────────────────────────────────────────────────────
+
+    def attach(self, table_id: str, game: Game, title: Optional[str] = None):
+        """Publica la partida como `table_id` y la sigue mientras cambie."""
+        table_id = _safe_id(table_id)
+        if table_id in self._tables:
+            self.detach(table_id)
+        table = _Table(table_id, title or table_id, game)
+        table.listener = lambda g, event, number: self._on_change(table, event, number)
+        self._tables[table_id] = table
+        os.makedirs(self._table_dir(table), exist_ok=True)
+        self._write(os.path.join(self._table_dir(table), "index.html"), self._render_page(table))
+        self._render(table, 0)
+        self._write_index()
+        game.add_listener(table.listener)
+
+    def detach(self, table_id: str):
+        """Deja de seguir la mesa; sus archivos quedan con el último estado."""
+        table = self._tables.pop(_safe_id(table_id), None)
+        if table is not None:
+            table.game.remove_listener(table.listener)
+            self._write_index()
+
+    def close(self):
+        for table_id in list(self._tables):
+            self.detach(table_id)
+
+    def _table_dir(self, table: _Table) -> str:
+        return os.path.join(self.folder, table.table_id)
+
+    # ── Actualización ─────────────────────────────────────────────────────────
+
+    def _on_change(self, table: _Table, event: str, number: int):
+        game = table.game
+        if event == "add":
+            first = len(game.rounds) - 1
+        elif event == "undo":
+            first = len(game.rounds)
+        else:  # edit / delete: cambian los acumulados desde esa mano
+            first = number - 1 - game.legacy_hands
+        try:
+            self._render(table, max(first, 0) // CHUNK_HANDS)
+        except OSError as e:
+            # Carpeta borrada, disco lleno, sin permisos: se deja de publicar
+            self._abandon()
+            if self.on_error is not None:
+                self.on_error(e)
+
+    def _abandon(self):
+        """Deja de seguir todas las mesas sin escribir nada más."""
+        for table in self._tables.values():
+            table.game.remove_listener(table.listener)
+        self._tables.clear()
+
+    def _render(self, table: _Table, first_chunk: int):
+        """Vuelve a generar totales, última mano y los tramos desde first_chunk."""
+        folder = self._table_dir(table)
+        game = table.game
+        chunks = -(-len(game.rounds) // CHUNK_HANDS)
+        self._put(table, "totals.html", self._render_totals(game))
+        self._put(table, "last.html", self._render_last(game))
+        for k in range(first_chunk, chunks):
+            self._put(table, f"history-{k}.html", self._render_chunk(game, k))
+        for k in range(chunks, table.chunks):  # tramos que quedaron vacíos
+            name = f"history-{k}.html"
+            table.revs.pop(name, None)
+            path = os.path.join(folder, name)
+            self._written.pop(path, None)
+            if os.path.exists(path):
+                os.remove(path)
+        table.chunks = chunks
+        state = {"hands": len(game.rounds),
+                 "winner": game.winner.name if game.winner else None,
+                 "revs": table.revs}
+        self._write(os.path.join(folder, "state.json"),
+                    json.dumps(state, ensure_ascii=False, separators=(",", ":")))
+
+    def _put(self, table: _Table, name: str, content: str):
+        table.revs[name] = self._write(os.path.join(self._table_dir(table), name), content)
+
+    def _write(self, path: str, content: str) -> int:
+        """Escribe si el contenido cambió; devuelve su revisión."""
+        rev = zlib.crc32(content.encode("utf-8"))
+        if self._written.get(path) != rev:
+            atomic_write(path, lambda f: f.write(content), fsync=False)
+            self._written[path] = rev
+            self.writes += 1
+        return rev
+
+    def _write_index(self):
+        items = "\n".join(_INDEX_ITEM.substitute(table_id=t.table_id, title=html.escape(t.title))
+                          for t in self._tables.values())
+        self._write(os.path.join(self.folder, "index.html"), _INDEX.substitute(items=items))
+
+    # ── Fragmentos ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _render_page(table: _Table) -> str:
+        headers = "".join(f"<th>{html.escape(t.name)}</th><th>Acum.</th>"
+                          for t in table.game.teams)
+        return _PAGE.substitute(title=html.escape(table.title), headers=headers,
+                                poll_ms=POLL_SECONDS * 1000)
+
+    @staticmethod
+    def _render_totals(game: Game) -> str:
+        teams = []
+        for team in game.teams:
+            won = team is game.winner
+            teams.append(_TEAM.substitute(
+                css=" winner" if won else "",
+                name=html.escape(team.name),
+                total=team.total,
+                percent=min(max(team.total, 0) * 100 // TARGET_SCORE, 100),
+                note="¡GANADOR! 🏆" if won else f"Faltan {TARGET_SCORE - team.total} pts",
+            ))
+        return _TOTALS.substitute(teams="".join(teams), current_round=game.current_round,
+                                  target=TARGET_SCORE)
+
+    @staticmethod
+    def _render_last(game: Game) -> str:
+        if not game.rounds:
+            return '<p class="muted">Todavía no se jugó ninguna mano.</p>'
+        rnd = game.rounds[len(game.rounds) - 1]
+        cells = "".join(f"<td>{html.escape(s.team_name)}: {s.total:+}</td>" for s in rnd.scores)
+        return _LAST.substitute(number=rnd.number, cells=cells)
+
+    @staticmethod
+    def _render_chunk(game: Game, k: int) -> str:
+        start = k * CHUNK_HANDS
+        stop = min(start + CHUNK_HANDS, len(game.rounds))
+        base = game.legacy_hands + start
+        acc = [game.index.score_after(i, base) for i in range(game.num_teams)]
+        rows = []
+        for pos in range(start, stop):
+            rnd = game.rounds[pos]
+            cells = []
+            for i, score in enumerate(rnd.scores):
+                acc[i] += score.total
+                cells.append(f"<td>{score.total:+}</td><td>{acc[i]}</td>")
+            rows.append(_ROW.substitute(number=rnd.number, cells="".join(cells)))
+        rows.reverse()  # la mano más reciente arriba
+        return "\n".join(rows)